@@ -0,0 +1,145 @@
+import os
+import hashlib
+import hmac
+import json
+import threading
+import time
+from collections import namedtuple
+from typing import Dict
+from gate_api import ApiClient, Configuration, FuturesApi
+from app import setup_logging
+from app.clock_offset import ClockOffsetTracker, get_clock_tracker
+from config import Config
+
+logger = setup_logging(
+    'api_clients',
+    os.path.join('logs', 'api_clients.log')
+)
+
+# 注册表中的客户端，secret 用于发现密钥变更
+ApiClientEntry = namedtuple('ApiClientEntry', ['api_client', 'futures_api', 'secret', 'created_at'])
+
+
+class SkewCorrectedApiClient(ApiClient):
+    """使用交易所时钟签名的 ApiClient
+
+    gate_api 在 gen_sign 中直接使用本地 time.time() 作为签名时间戳，
+    这里改为使用时钟偏差跟踪器校正后的时间，签名算法与 gate_api 一致。
+    """
+
+    def __init__(self, configuration: Configuration, clock: ClockOffsetTracker):
+        super().__init__(configuration)
+        self.clock = clock
+
+    def gen_sign(self, method, url, query_string=None, body=None):
+        # 除时间戳外照搬 gate_api 4.20.0（requirements 固定的版本）的 ApiClient.gen_sign，升级 SDK 时需核对签名算法
+        t = self.clock.now()
+        m = hashlib.sha512()
+        if body is not None:
+            if not isinstance(body, str):
+                body = json.dumps(body)
+            m.update(body.encode('utf-8'))
+        hashed_payload = m.hexdigest()
+        s = '%s\n%s\n%s\n%s\n%s' % (method, url, query_string or "", hashed_payload, t)
+        sign = hmac.new(self.configuration.secret.encode('utf-8'), s.encode('utf-8'), hashlib.sha512).hexdigest()
+        return {'KEY': self.configuration.key, 'Timestamp': str(t), 'SIGN': sign}
+
+
+class ApiClientRegistry:
+    """进程级 ApiClient 注册表
+
+    按 (API Key, host) 复用 ApiClient 及其 urllib3 连接池（keep-alive），
+    切换账户只需一次字典查找，不再重新建立 TLS 连接。
+    超过 idle_seconds 未使用的客户端会被关闭并移除；长期持有客户端的调用方
+    每次调用前通过 touch() 记录使用。
+    """
+
+    def __init__(self, idle_seconds: float, pool_size: int):
+        """
+        Args:
+            idle_seconds: 客户端空闲多久后被回收
+            pool_size: 每个客户端连接池的最大连接数
+        """
+        self.idle_seconds = idle_seconds
+        self.pool_size = pool_size
+        self._entries = {}
+        self._last_used = {}
+        self._last_sweep = time.monotonic()
+        self._lock = threading.Lock()
+        self.created = 0
+        self.reused = 0
+
+    def _create(self, api_key: str, secret: str, host: str) -> ApiClientEntry:
+        config = Configuration(key=api_key, secret=secret, host=host)
+        config.connection_pool_maxsize = self.pool_size
+        api_client = SkewCorrectedApiClient(config, get_clock_tracker(host))
+        self.created += 1
+        return ApiClientEntry(api_client, FuturesApi(api_client), secret, time.time())
+
+    @staticmethod
+    def _close(entry: ApiClientEntry):
+        try:
+            entry.api_client.close()
+            entry.api_client.rest_client.pool_manager.clear()
+        except Exception as e:
+            logger.warning(f"关闭API客户端失败: {str(e)}")
+
+    def get(self, api_key: str, secret: str, host: str) -> ApiClientEntry:
+        """获取（必要时创建）指定 API Key 的客户端"""
+        key = (api_key, host)
+        now = time.monotonic()
+        with self._lock:
+            self._sweep(now)
+            entry = self._entries.get(key)
+            if entry is not None and entry.secret != secret:
+                # 密钥已变更，丢弃旧客户端
+                self._close(entry)
+                entry = None
+            if entry is None:
+                entry = self._create(api_key, secret, host)
+                self._entries[key] = entry
+            else:
+                self.reused += 1
+            self._last_used[key] = now
+            return entry
+
+    def touch(self, api_key: str, host: str, api_client: ApiClient) -> bool:
+        """记录客户端被使用
+        
+        Returns:
+            客户端仍在注册表中时返回 True；已被回收或替换时返回 False，调用方应重新 get()
+        """
+        key = (api_key, host)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.api_client is not api_client:
+                return False
+            self._last_used[key] = time.monotonic()
+            return True
+
+    def _sweep(self, now: float):
+        """回收空闲客户端（调用方持有锁），每 idle_seconds 最多执行一次"""
+        if now - self._last_sweep < self.idle_seconds:
+            return
+        self._last_sweep = now
+        for key, last_used in list(self._last_used.items()):
+            if now - last_used >= self.idle_seconds:
+                self._close(self._entries.pop(key))
+                del self._last_used[key]
+                logger.info(f"回收空闲API客户端: {key[0][:6]}***")
+
+    def clear(self):
+        """关闭并移除所有客户端"""
+        with self._lock:
+            for entry in self._entries.values():
+                self._close(entry)
+            self._entries.clear()
+            self._last_used.clear()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'clients': len(self._entries), 'created': self.created, 'reused': self.reused}
+
+
+# 所有 DataManager 实例共享的客户端注册表
+api_client_registry = ApiClientRegistry(Config.API_CLIENT_IDLE_SECONDS, Config.API_CLIENT_POOL_SIZE)
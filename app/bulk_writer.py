@@ -0,0 +1,102 @@
+import time
+from typing import Dict, List
+from app.database import DatabaseConnection
+
+
+class PriceTickWriter:
+    """price_range_20d 实时行情批量写入器
+
+    所有行在一个事务中通过一条 INSERT ... ON DUPLICATE KEY UPDATE 语句写入，
+    pymysql 的 executemany 会把多行参数合并为多值 INSERT，避免逐行 UPDATE。
+    """
+
+    COLUMNS = (
+        'id', 'symbol', 'high_price_20d', 'low_price_20d', 'last_price',
+        'amplitude', 'position_ratio', 'volume_24h', 'update_date', 'update_time'
+    )
+    UPDATE_COLUMNS = ('last_price', 'amplitude', 'position_ratio', 'volume_24h', 'update_time')
+
+    SQL = (
+        f"INSERT INTO price_range_20d ({', '.join(COLUMNS)}) "
+        f"VALUES ({', '.join(['%s'] * len(COLUMNS))}) "
+        f"ON DUPLICATE KEY UPDATE "
+        + ', '.join(f"{column} = VALUES({column})" for column in UPDATE_COLUMNS)
+    )
+
+    def __init__(self, db_connection: DatabaseConnection):
+        self.db_connection = db_connection
+
+    def write(self, rows: List[Dict]) -> Dict:
+        """批量写入行情数据
+
+        Args:
+            rows: 每行包含 COLUMNS 中所有字段的字典，id 为已有记录的主键
+
+        Returns:
+            写入指标：rows 提交行数，affected 影响行数（MySQL 对更新行计2、未变化行计0），
+            elapsed 耗时（秒）
+        """
+        if not rows:
+            return {'rows': 0, 'affected': 0, 'elapsed': 0.0}
+
+        params = [tuple(row[column] for column in self.COLUMNS) for row in rows]
+        start = time.perf_counter()
+        with self.db_connection.get_connection() as conn:
+            with conn.cursor() as cursor:
+                affected = cursor.executemany(self.SQL, params)
+        elapsed = time.perf_counter() - start
+        return {'rows': len(rows), 'affected': affected or 0, 'elapsed': elapsed}
+
+
+class TickChangeTracker:
+    """记录每个品种最近一次写入的行情值，用于只写入发生变化的行
+
+    数值变化超过相对误差 epsilon 的行会被写入；未变化的行在距上次写入达到
+    heartbeat_seconds 后也会写入一次，以刷新 update_time。
+    """
+
+    TRACKED_COLUMNS = ('last_price', 'amplitude', 'position_ratio', 'volume_24h')
+
+    def __init__(self, epsilon: float, heartbeat_seconds: float):
+        self.epsilon = epsilon
+        self.heartbeat_seconds = heartbeat_seconds
+        self._persisted = {}  # symbol -> (update_date, 数值元组, update_time)
+
+    def seed(self, record):
+        """用数据库记录初始化尚未跟踪的品种"""
+        if record.symbol in self._persisted:
+            return
+        self._persisted[record.symbol] = (
+            record.update_date,
+            tuple(float(getattr(record, column) or 0) for column in self.TRACKED_COLUMNS),
+            record.update_time
+        )
+
+    def _changed(self, old: float, new: float) -> bool:
+        return abs(new - old) > self.epsilon * max(abs(old), abs(new))
+
+    def select(self, rows: List[Dict], now) -> List[Dict]:
+        """筛选需要写入的行：数值有变化、日期变化或到达心跳时间"""
+        dirty_rows = []
+        for row in rows:
+            persisted = self._persisted.get(row['symbol'])
+            if persisted is None:
+                dirty_rows.append(row)
+                continue
+            update_date, values, update_time = persisted
+            new_values = tuple(float(row[column]) for column in self.TRACKED_COLUMNS)
+            if (update_date != row['update_date']
+                    or any(self._changed(old, new) for old, new in zip(values, new_values))
+                    or update_time is None
+                    or (now - update_time).total_seconds() >= self.heartbeat_seconds):
+                dirty_rows.append(row)
+        return dirty_rows
+
+    def mark_persisted(self, rows: List[Dict]):
+        """写入成功后记录已持久化的值"""
+        for row in rows:
+            self._persisted[row['symbol']] = (
+                row['update_date'],
+                tuple(float(row[column]) for column in self.TRACKED_COLUMNS),
+                row['update_time']
+            )
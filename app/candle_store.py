@@ -0,0 +1,128 @@
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import func
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from app import db
+from app.models import OhlcvCandle
+
+# K线周期对应的秒数
+INTERVAL_SECONDS = {
+    '1m': 60,
+    '5m': 300,
+    '15m': 900,
+    '30m': 1800,
+    '1h': 3600,
+    '4h': 14400,
+    '8h': 28800,
+    '1d': 86400,
+}
+
+
+class CandleStore:
+    """基于 ohlcv_candle 表的本地K线存储
+
+    以 (symbol, interval, timestamp) 为键保存K线，重复写入同一根K线时覆盖旧值，
+    因此可以从最后一根已存K线开始增量追加，未收盘的K线会在下次追加时被修正。
+    需要在 Flask 应用上下文中调用。
+    """
+
+    def get_last_timestamps(self, interval: str) -> Dict[str, int]:
+        """获取每个品种已存储的最新K线时间戳"""
+        rows = db.session.query(
+            OhlcvCandle.symbol,
+            func.max(OhlcvCandle.timestamp)
+        ).filter(
+            OhlcvCandle.interval == interval
+        ).group_by(OhlcvCandle.symbol).all()
+        return {symbol: int(timestamp) for symbol, timestamp in rows}
+
+    def get_window_coverage(self, interval: str, start_timestamp: int) -> Dict[str, Tuple[int, int]]:
+        """统计每个品种在 start_timestamp（含）之后已存储的K线
+
+        Returns:
+            品种到 (最新K线时间戳, K线数量) 的映射
+        """
+        rows = db.session.query(
+            OhlcvCandle.symbol,
+            func.max(OhlcvCandle.timestamp),
+            func.count(OhlcvCandle.timestamp)
+        ).filter(
+            OhlcvCandle.interval == interval,
+            OhlcvCandle.timestamp >= start_timestamp
+        ).group_by(OhlcvCandle.symbol).all()
+        return {symbol: (int(timestamp), count) for symbol, timestamp, count in rows}
+
+    def append(self, symbol: str, interval: str, candles: List[dict]) -> int:
+        """追加K线数据，已存在的K线按最新数据覆盖
+
+        Args:
+            symbol: 品种代码
+            interval: K线周期
+            candles: DataManager.get_futures_candlesticks 返回的K线字典列表
+
+        Returns:
+            写入的K线数量
+        """
+        if not candles:
+            return 0
+
+        rows = [
+            {
+                'symbol': symbol,
+                'interval': interval,
+                'timestamp': int(candle['timestamp']),
+                'open': candle['open'],
+                'high': candle['high'],
+                'low': candle['low'],
+                'close': candle['close'],
+                'volume': candle['volume'],
+            }
+            for candle in candles
+        ]
+        stmt = mysql_insert(OhlcvCandle).values(rows)
+        stmt = stmt.on_duplicate_key_update(
+            open=stmt.inserted.open,
+            high=stmt.inserted.high,
+            low=stmt.inserted.low,
+            close=stmt.inserted.close,
+            volume=stmt.inserted.volume,
+        )
+        try:
+            db.session.execute(stmt)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+        return len(rows)
+
+    def load_close_series(self, interval: str, end_timestamp: int, limit: int) -> Dict[str, List[float]]:
+        """一次读取所有品种截止到 end_timestamp（含）的最近 limit 根K线收盘价"""
+        start_timestamp = end_timestamp - limit * INTERVAL_SECONDS[interval]
+        rows = db.session.query(
+            OhlcvCandle.symbol,
+            OhlcvCandle.close
+        ).filter(
+            OhlcvCandle.interval == interval,
+            OhlcvCandle.timestamp > start_timestamp,
+            OhlcvCandle.timestamp <= end_timestamp
+        ).order_by(OhlcvCandle.symbol, OhlcvCandle.timestamp).all()
+        
+        close_series = {}
+        for symbol, close in rows:
+            close_series.setdefault(symbol, []).append(float(close))
+        return close_series
+
+    def load_candles(self, symbol: str, interval: str, end_timestamp: int, limit: int,
+                     start_timestamp: Optional[int] = None) -> List[OhlcvCandle]:
+        """读取截止到 end_timestamp（含）的最近 limit 根K线，按时间升序返回
+
+        指定 start_timestamp 时只读取该时间（含）之后的K线。
+        """
+        query = OhlcvCandle.query.filter(
+            OhlcvCandle.symbol == symbol,
+            OhlcvCandle.interval == interval,
+            OhlcvCandle.timestamp <= end_timestamp
+        )
+        if start_timestamp is not None:
+            query = query.filter(OhlcvCandle.timestamp >= start_timestamp)
+        candles = query.order_by(OhlcvCandle.timestamp.desc()).limit(limit).all()
+        return list(reversed(candles))
@@ -0,0 +1,133 @@
+import os
+import threading
+import time
+from typing import Dict
+import requests
+from app import setup_logging
+from config import Config
+
+logger = setup_logging(
+    'clock_offset',
+    os.path.join('logs', 'clock_offset.log')
+)
+
+
+class ClockOffsetTracker:
+    """交易所时钟偏差跟踪
+
+    通过公共接口 /spot/time 估计交易所时间与本地时间的偏差：取请求发出和收到响应的
+    中点作为服务器时间对应的本地时间，多次采样时取往返时间最短的一次。
+    签名时使用 now() 代替 time.time()，本地时钟漂移不再导致 REQUEST_EXPIRED。
+    到达校准时间后在后台线程校准，签名始终使用当前偏差，不等待时间接口。
+    """
+
+    def __init__(self, host: str, sync_interval: float, samples: int = 3, timeout: float = 5):
+        """
+        Args:
+            host: 交易所 API 地址（如 https://api.gateio.ws/api/v4）
+            sync_interval: 两次自动校准的间隔（秒）
+            samples: 每次校准的采样次数
+            timeout: 单次请求超时（秒）
+        """
+        self.host = host.rstrip('/')
+        self.sync_interval = sync_interval
+        self.samples = max(1, samples)
+        self.timeout = timeout
+        self.offset = 0.0  # 交易所时间 - 本地时间（秒）
+        self.rtt = None  # 最近一次校准的往返时间（秒）
+        self.synced_at = None  # 最近一次成功校准的 time.monotonic() 时间
+        self.sync_count = 0
+        self.error_count = 0
+        self._next_sync = 0.0
+        self._session = requests.Session()
+        self._lock = threading.Lock()
+        self._syncing = False  # 后台校准线程是否在运行
+        self._syncing_lock = threading.Lock()
+
+    def _sample(self):
+        """采样一次，返回 (偏差, 往返时间)"""
+        sent = time.time()
+        response = self._session.get(f"{self.host}/spot/time", timeout=self.timeout)
+        received = time.time()
+        response.raise_for_status()
+        server_time = response.json()['server_time'] / 1000
+        return server_time - (sent + received) / 2, received - sent
+
+    def sync(self, force: bool = True) -> bool:
+        """校准时钟偏差，失败时保留原偏差并返回 False
+
+        Args:
+            force: 为 False 时仅在到达校准时间后执行，并发调用只校准一次
+        """
+        with self._lock:
+            if not force and time.monotonic() < self._next_sync:
+                return True
+            try:
+                offset, rtt = min((self._sample() for _ in range(self.samples)), key=lambda s: s[1])
+            except Exception as e:
+                self.error_count += 1
+                # 失败后一分钟内不再自动重试，避免每次签名都请求时间接口
+                self._next_sync = time.monotonic() + min(self.sync_interval, 60)
+                logger.warning(f"校准交易所时钟失败: {str(e)}")
+                return False
+
+            self.offset = offset
+            self.rtt = rtt
+            self.synced_at = time.monotonic()
+            self._next_sync = self.synced_at + self.sync_interval
+            self.sync_count += 1
+            logger.info(f"交易所时钟偏差: {offset * 1000:.1f} ms, 往返时间: {rtt * 1000:.1f} ms")
+            return True
+
+    def _background_sync(self):
+        try:
+            self.sync(force=False)
+        finally:
+            with self._syncing_lock:
+                self._syncing = False
+
+    def sync_in_background(self):
+        """在后台线程校准，已有校准线程在运行时不重复启动"""
+        with self._syncing_lock:
+            if self._syncing:
+                return
+            self._syncing = True
+        threading.Thread(target=self._background_sync, name='clock-sync', daemon=True).start()
+
+    def now(self) -> float:
+        """返回按交易所时钟校正后的当前时间（秒），偏差到期时启动后台校准"""
+        if time.monotonic() >= self._next_sync:
+            self.sync_in_background()
+        return time.time() + self.offset
+
+    def stats(self) -> Dict:
+        """时钟偏差指标"""
+        return {
+            'host': self.host,
+            'offset_ms': round(self.offset * 1000, 1),
+            'rtt_ms': round(self.rtt * 1000, 1) if self.rtt is not None else None,
+            'age': round(time.monotonic() - self.synced_at, 1) if self.synced_at is not None else None,
+            'syncs': self.sync_count,
+            'errors': self.error_count
+        }
+
+
+_trackers = {}
+_trackers_lock = threading.Lock()
+
+
+def get_clock_tracker(host: str) -> ClockOffsetTracker:
+    """获取指定交易所地址的时钟偏差跟踪器（进程内共享）"""
+    with _trackers_lock:
+        tracker = _trackers.get(host)
+        if tracker is None:
+            tracker = ClockOffsetTracker(host, Config.CLOCK_SYNC_INTERVAL, Config.CLOCK_SYNC_SAMPLES)
+            _trackers[host] = tracker
+        return tracker
+
+
+def clock_stats() -> list:
+    """所有跟踪器的时钟偏差指标"""
+    with _trackers_lock:
+        trackers = list(_trackers.values())
+    return [tracker.stats() for tracker in trackers]
@@ -0,0 +1,94 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, List
+from app import setup_logging
+from config import Config
+
+logger = setup_logging(
+    'contract_cache',
+    os.path.join('logs', 'contract_cache.log')
+)
+
+# 下单返回这些错误时说明本地合约信息已过期（合约下架或进入下架流程）
+DELISTING_LABELS = ('CONTRACT_NOT_FOUND', 'CONTRACT_IN_DELISTING', 'CONTRACT_NO_COUNTER')
+
+
+class ContractCache:
+    """进程级期货合约元数据缓存
+
+    通过一次 list_futures_contracts 调用加载全部合约，以去掉 _USDT 后缀的品种代码为键，
+    查询为 O(1) 字典查找。缓存超过 ttl 或收到下架信号（invalidate）后，
+    下一次查询时重新加载；并发查询只触发一次加载。
+    """
+
+    def __init__(self, ttl: float, miss_refresh_interval: float = 60):
+        """
+        Args:
+            ttl: 缓存有效期（秒）
+            miss_refresh_interval: 查询不存在的品种时，两次重新加载的最小间隔（秒）
+        """
+        self.ttl = ttl
+        self.miss_refresh_interval = miss_refresh_interval
+        self._contracts = {}
+        self._loaded_at = 0.0
+        self._stale = True
+        self._lock = threading.Lock()
+        self.refresh_count = 0
+
+    @property
+    def age(self) -> float:
+        """距上次加载的秒数"""
+        return time.monotonic() - self._loaded_at if self._loaded_at else float('inf')
+
+    def invalidate(self, reason: str = ''):
+        """标记缓存过期，下次查询时重新加载"""
+        self._stale = True
+        logger.info(f"合约缓存失效{f'：{reason}' if reason else ''}")
+
+    def _refresh(self, loader: Callable[[], List]):
+        """加载全部合约（调用方持有锁）"""
+        contracts = loader()
+        self._contracts = {contract.name.replace('_USDT', ''): contract for contract in contracts}
+        self._loaded_at = time.monotonic()
+        self._stale = False
+        self.refresh_count += 1
+        logger.info(f"合约缓存已刷新: {len(self._contracts)} 个合约")
+
+    def _ensure_fresh(self, loader: Callable[[], List]):
+        if not self._stale and self.age < self.ttl:
+            return
+        with self._lock:
+            # 等待锁期间其他线程可能已经完成加载
+            if self._stale or self.age >= self.ttl:
+                self._refresh(loader)
+
+    def get(self, symbol: str, loader: Callable[[], List]):
+        """查询单个合约，不存在时返回 None
+
+        Args:
+            symbol: 品种代码（不含 _USDT 后缀）
+            loader: 返回 list_futures_contracts 结果的函数，仅在需要加载时调用
+        """
+        self._ensure_fresh(loader)
+        contract = self._contracts.get(symbol)
+        if contract is None and self.age >= self.miss_refresh_interval:
+            # 可能是新上线的合约，限制频率地重新加载一次
+            with self._lock:
+                if self.age >= self.miss_refresh_interval:
+                    self._refresh(loader)
+            contract = self._contracts.get(symbol)
+        return contract
+
+    def get_all(self, loader: Callable[[], List], include_delisting: bool = False) -> Dict[str, object]:
+        """返回品种到合约的映射，默认不含下架中的合约"""
+        self._ensure_fresh(loader)
+        contracts = self._contracts
+        if include_delisting:
+            return dict(contracts)
+        return {symbol: contract for symbol, contract in contracts.items()
+                if not getattr(contract, 'in_delisting', False)}
+
+
+# 所有 DataManager 实例共享的合约缓存
+contract_cache = ContractCache(Config.CONTRACT_CACHE_TTL)
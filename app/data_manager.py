@@ -1,12 +1,22 @@
 from typing import List, Optional
-from app.database import DatabaseConnection, DatabaseManager
+from app.database import DatabaseConnection
 from app.models import Position, FuturesContractInfo, AccountInfo
 import logging
-from gate_api import ApiClient, Configuration, FuturesApi, SpotApi
 from gate_api.exceptions import ApiException, GateApiException
 import os
 from app import setup_logging
+from app.rate_limiter import exchange_rate_limiter
+from app.range_history import PriceRangeHistoryStore
+from app.market_replay import wrap_futures_api
+from app.api_clients import api_client_registry
+from app.contract_cache import contract_cache, DELISTING_LABELS
+from app.ticker_snapshot import ticker_snapshot, TickerView
+from app.position_cache import position_cache, leverage_cache
+from config import Config
 import math
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+import threading
 import time
 
 # 配置日志
@@ -16,15 +26,20 @@ logger = setup_logging(
 )
 
 class DataManager:
-    def __init__(self, server_id: str):
+    def __init__(self, server_id: str, host: Optional[str] = None):
+        """
+        Args:
+            server_id: 数据库服务器编号
+            host: 交易所 API 地址，默认使用 Config.GATE_API_HOST（压测时可指向本地替身服务）
+        """
         self.server_id = server_id
+        self.host = host or Config.GATE_API_HOST
         self.db_connection = DatabaseConnection(server_id)
         self.account_info = None
         self.futures_api = None
         self.api_client = None
         self.logger = logger
-        self._positions_cache = {}  # 添加持仓缓存
-        self._positions_cache_time = 0  # 缓存时间戳
+        self.last_order_result = None  # 最近一次 create_order 的成交汇总
     
     def _init_api(self):
         """初始化API客户端"""
@@ -32,27 +47,16 @@ class DataManager:
             raise ValueError("未设置账户信息，请先调用 init_api_credentials")
             
         try:
-            # 创建API配置
-            config = Configuration(
-                key=self.account_info.apikey,
-                secret=self.account_info.secretkey,
-                host="https://api.gateio.ws/api/v4"  # 确保使用正确的API地址
+            # 从进程级注册表获取客户端，同一 API Key 复用连接池
+            entry = api_client_registry.get(
+                self.account_info.apikey,
+                self.account_info.secretkey,
+                self.host
             )
+            self.api_client = entry.api_client
             
-            # 创建API客户端
-            self.api_client = ApiClient(config)
-            
-            # 设置请求头中的时间戳
-            def apply_auth_to_request(request, _):
-                import time
-                request.header_params['Timestamp'] = str(int(time.time()))
-                return request
-                
-            # 添加请求预处理器
-            self.api_client.pre_request_hook = apply_auth_to_request
-            
-            # 创建期货API实例
-            self.futures_api = FuturesApi(self.api_client)
+            # 期货API实例（录制/回放模式下由 market_replay 包装）
+            self.futures_api = wrap_futures_api(entry.futures_api, self.account_info.apikey)
             
             logger.debug(f"API客户端初始化成功")
             
@@ -98,47 +102,36 @@ class DataManager:
             return None
     
     def _get_account_positions(self, account_info: AccountInfo, force_update=False):
-        """获取账户持仓信息（带缓存）"""
-        current_time = time.time()
-        cache_key = account_info.acct_id
+        """获取账户持仓信息（使用进程级持仓缓存，按 API Key 区分账户）"""
+        cache_key = account_info.apikey
         
         # 检查是否需要重新初始化API（账户变化或未初始化）
         if not self.account_info or self.account_info.acct_id != account_info.acct_id:
             logger.info(f"切换账户: {self.account_info.acct_id if self.account_info else 'None'} -> {account_info.acct_id}")
             self.init_api(account_info)
         
-        # 如果缓存存在且未过期（3秒内）且不强制更新
-        if not force_update and cache_key in self._positions_cache:
-            if current_time - self._positions_cache_time < 3:
-                return self._positions_cache[cache_key]
+        # 缓存未过期且不强制更新时直接返回
+        if not force_update:
+            positions = position_cache.get(cache_key)
+            if positions is not None:
+                return positions
         
         try:
-            # 获取所有持仓信息
-            positions = self.futures_api.list_positions("usdt", holding="true")
+            # 获取所有持仓信息（holding 参数只有较新的 gate_api 支持，这里在本地过滤空仓）
+            positions = [
+                position for position in self.call_futures_api('list_positions', "usdt")
+                if int(position.size) != 0
+            ]
             
             # 更新缓存
-            self._positions_cache[cache_key] = positions
-            self._positions_cache_time = current_time
+            position_cache.set(cache_key, positions)
+            leverage_cache.seed(cache_key, positions)
             
             return positions
             
         except Exception as e:
+            # 时间戳过期已由 call_futures_api 校准时钟后重试
             logger.error(f"获取账户持仓失败: {str(e)}")
-            # 如果是时间戳错误，尝试重新初始化API并重试一次
-            if "REQUEST_EXPIRED" in str(e):
-                try:
-                    logger.info("检测到时间戳过期，重新初始化API并重试")
-                    self.init_api(account_info)
-                    positions = self.futures_api.list_positions("usdt", holding="true")
-                    
-                    # 更新缓存
-                    self._positions_cache[cache_key] = positions
-                    self._positions_cache_time = current_time
-                    
-                    return positions
-                except Exception as retry_e:
-                    logger.error(f"重试获取持仓失败: {str(retry_e)}")
-                    return None
             return None
     
     def init_api(self, account_info: AccountInfo):
@@ -150,21 +143,56 @@ class DataManager:
         """获取期货API实例"""
         if not self.futures_api:
             self._init_api()
+        elif not api_client_registry.touch(self.account_info.apikey, self.host, self.api_client):
+            # 缓存的客户端已被注册表回收或替换
+            self._init_api()
         return self.futures_api
 
+    def call_futures_api(self, endpoint: str, *args, **kwargs):
+        """经进程级限流器调用期货API
+        
+        Args:
+            endpoint: FuturesApi 方法名，用于选择限频桶和权重
+        """
+        futures_api = self.get_futures_api()
+        api_key = self.account_info.apikey if self.account_info else None
+        rate_limited = getattr(futures_api, 'rate_limited', True)
+        if rate_limited:
+            exchange_rate_limiter.acquire(endpoint, api_key)
+        try:
+            return getattr(futures_api, endpoint)(*args, **kwargs)
+        except ApiException as e:
+            if e.status == 429:
+                logger.warning(f"接口 {endpoint} 触发限频，暂停后续请求")
+                exchange_rate_limiter.backoff(endpoint, api_key)
+            clock = getattr(self.api_client, 'clock', None)
+            if getattr(e, 'label', None) == 'REQUEST_EXPIRED' and clock is not None and clock.sync():
+                # 被拒绝的请求未执行，校准时钟后重试一次即可，无需重建客户端
+                logger.warning(f"接口 {endpoint} 时间戳过期，已重新校准交易所时钟，重试一次")
+                if rate_limited:
+                    exchange_rate_limiter.acquire(endpoint, api_key)
+                return getattr(futures_api, endpoint)(*args, **kwargs)
+            raise
+
+    def _load_contracts(self):
+        """从交易所获取全部合约（供合约缓存加载）"""
+        return self.call_futures_api('list_futures_contracts', settle='usdt')
+
+    def get_contract_map(self) -> dict:
+        """从进程级合约缓存获取品种到合约的映射（不含下架中的合约）"""
+        return contract_cache.get_all(self._load_contracts)
+
+    def get_contract(self, symbol: str):
+        """从进程级合约缓存获取单个合约，不存在时返回 None"""
+        return contract_cache.get(symbol, self._load_contracts)
+
     def get_futures_contracts(self) -> List[FuturesContractInfo]:
         """获取所有期货合约"""
         try:
-            futures_api = self.get_futures_api()
-            contracts = futures_api.list_futures_contracts(settle='usdt')
-            
-            # 移除 _USDT 后缀
+            # 品种代码已移除 _USDT 后缀
             return [
-                FuturesContractInfo(
-                    symbol=contract.name.replace('_USDT', ''),
-                    name=contract.name.replace('_USDT', '')
-                )
-                for contract in contracts
+                FuturesContractInfo(symbol=symbol, name=symbol)
+                for symbol in self.get_contract_map()
             ]
         except (ApiException, GateApiException) as e:
             logger.error(f"获取合约列表失败: {str(e)}")
@@ -354,16 +382,20 @@ class DataManager:
             raise 
 
     def get_futures_candlesticks(self, symbol: str, from_time: int, to_time: int, interval: str = '1d'):
-        """获取期货K线数据"""
+        """获取期货K线数据
+        
+        Returns:
+            K线字典列表；交易所没有K线时返回空列表，请求失败时返回 None
+        """
         try:
-            futures_api = self.get_futures_api()
             # 添加 _USDT 后缀
             contract = f"{symbol}_USDT"
             
             logger.debug(f"获取 {contract} K线数据")
             
             # 使用正确的参数名称调用API
-            response = futures_api.list_futures_candlesticks(
+            response = self.call_futures_api(
+                'list_futures_candlesticks',
                 "usdt",  # settle 参数
                 contract,  # 合约名称
                 _from=from_time,  # 注意这里使用 _from
@@ -373,7 +405,7 @@ class DataManager:
             
             if not response:
                 logger.warning(f"{contract} 没有K线数据")
-                return None
+                return []
             
             # 转换响应数据
             candles = []
@@ -398,28 +430,28 @@ class DataManager:
             logger.error(f"获取K线数据时发生错误: {str(e)}")
             return None
 
-    def get_ticks(self, symbols):
-        """获取实时行情数据"""
+    def _load_tickers(self):
+        """从交易所获取全量行情（供共享行情快照刷新）"""
+        return self.call_futures_api('list_futures_tickers', settle='usdt')
+
+    def get_ticker_snapshot(self, max_age: Optional[float] = None) -> TickerView:
+        """获取进程共享的全量行情快照
+
+        Args:
+            max_age: 可接受的行情年龄（秒），默认 TICKER_SNAPSHOT_MAX_AGE；快照过旧时才重新获取
+        """
+        return ticker_snapshot.get(self._load_tickers, max_age)
+
+    def get_ticks(self, symbols, max_age: Optional[float] = None):
+        """获取实时行情数据（来自共享行情快照）"""
         try:
-            futures_api = self.get_futures_api()
-            
             # 将请求的符号列表转换为集合，便于快速查找
             symbol_set = set(symbols)
             
-            # 获取所有行情数据
-            tickers = futures_api.list_futures_tickers(settle='usdt')
-            
-            # 创建映射，移除 Gate.io 返回数据中的 _USDT 后缀
-            result = {}
-            for ticker in tickers:
-                original_symbol = ticker.contract
-                processed_symbol = original_symbol.replace('_USDT', '')
-                
-                # 检查处理后的符号是否在请求的符号列表中
-                if processed_symbol in symbol_set:
-                    result[processed_symbol] = ticker
-                    logger.debug(f"匹配到合约: {processed_symbol}, "
-                               f"24h成交量: {ticker.volume_24h_settle:,.0f} USDT")
+            # 按品种从快照中查找，品种代码已移除 _USDT 后缀
+            snapshot = self.get_ticker_snapshot(max_age)
+            result = {symbol: snapshot.tickers[symbol] for symbol in symbol_set if symbol in snapshot.tickers}
+            logger.debug(f"行情快照年龄: {snapshot.age:.2f}s")
             
             # 记录匹配结果
             matched_symbols = set(result.keys())
@@ -439,8 +471,47 @@ class DataManager:
             logger.error(f"获取实时行情时发生错误: {str(e)}")
             return {}
 
+    def get_last_price(self, symbol: str, max_age: Optional[float] = None) -> float:
+        """获取单个合约的最新成交价
+
+        共享行情快照足够新时直接使用，否则只请求该合约的行情，不为下单刷新全量行情。
+
+        Args:
+            max_age: 可接受的快照年龄（秒），默认 ORDER_PRICE_MAX_AGE
+        """
+        max_age = Config.ORDER_PRICE_MAX_AGE if max_age is None else max_age
+        snapshot = ticker_snapshot.peek()
+        if snapshot is not None and snapshot.age <= max_age:
+            ticker = snapshot.get(symbol)
+            if ticker:
+                return float(ticker.last)
+        
+        tickers = self.call_futures_api('list_futures_tickers', settle='usdt', contract=f"{symbol}_USDT")
+        if not tickers:
+            raise ValueError(f"{symbol} 没有行情数据")
+        return float(tickers[0].last)
+
+    @staticmethod
+    def _check_delisting(error: Exception, contract: str):
+        """下单错误表明合约已下架时，使合约缓存失效"""
+        if getattr(error, 'label', None) in DELISTING_LABELS:
+            contract_cache.invalidate(f"{contract} {error.label}")
+
     def create_order(self, account_info: AccountInfo, symbol: str, direction: str, amount: float, leverage: int) -> bool:
-        """创建订单"""
+        """创建订单
+
+        超过最大下单量时拆分为多个子订单并发提交（见 submit_order_slices）。某个子订单失败后
+        不再提交后续子订单，但已在途的子订单仍会成交，因此返回 False 时可能已部分开仓，
+        成交明细见 last_order_result。
+        """
+        try:
+            return self._create_order(account_info, symbol, direction, amount, leverage)
+        finally:
+            # 无论是否全部成交，下单后该账户的持仓缓存都已不可信
+            position_cache.invalidate(account_info.apikey)
+
+    def _create_order(self, account_info: AccountInfo, symbol: str, direction: str, amount: float, leverage: int) -> bool:
+        """创建订单的实现，见 create_order"""
         try:
             # 确保API已初始化
             if not self.futures_api:
@@ -449,18 +520,21 @@ class DataManager:
             # 构建合约名称
             contract = f"{symbol}_USDT"
             
-            # 1. 获取合约信息
+            # 1. 获取合约信息（合约参数来自进程级缓存）
             try:
-                contract_info = self.futures_api.get_futures_contract(
-                    settle='usdt',
-                    contract=contract
-                )
+                contract_info = self.get_contract(symbol)
+                if not contract_info:
+                    logger.error(f"合约不存在: {contract}")
+                    return False
+                if getattr(contract_info, 'in_delisting', False):
+                    logger.error(f"合约下架中，不允许开仓: {contract}")
+                    return False
                 
                 # 获取合约参数
                 max_size = float(contract_info.order_size_max)  # 最大下单量
                 min_size = float(contract_info.order_size_min)  # 最小下单量
                 contract_size = float(contract_info.quanto_multiplier)  # 合约面值
-                current_price = float(contract_info.last_price)  # 当前价格
+                current_price = self.get_last_price(symbol)  # 当前价格
                 leverage_max = float(contract_info.leverage_max)  # 最大杠杆
                 
                 logger.info(f"合约信息: {symbol} "
@@ -474,17 +548,23 @@ class DataManager:
             
             # 2. 设置杠杆
             try:
-                # 设置杠杆倍数
+                # 设置杠杆倍数，已是目标杠杆时跳过
                 actual_leverage = min(leverage, int(leverage_max))
-                self.futures_api.update_position_leverage(
-                    settle='usdt',
-                    contract=contract,
-                    leverage=str(actual_leverage)
-                )
-                logger.info(f"设置杠杆成功: {symbol} {actual_leverage}x")
+                if leverage_cache.get(account_info.apikey, contract) == actual_leverage:
+                    logger.info(f"杠杆已是 {actual_leverage}x，跳过设置: {symbol}")
+                else:
+                    self.call_futures_api(
+                        'update_position_leverage',
+                        settle='usdt',
+                        contract=contract,
+                        leverage=str(actual_leverage)
+                    )
+                    leverage_cache.set(account_info.apikey, contract, actual_leverage)
+                    logger.info(f"设置杠杆成功: {symbol} {actual_leverage}x")
                 
             except Exception as e:
                 logger.error(f"设置杠杆失败: {str(e)}")
+                leverage_cache.invalidate(account_info.apikey, contract)
                 return False
             
             # 3. 计算并执行分批下单
@@ -503,49 +583,129 @@ class DataManager:
                 
                 logger.info(f"计算得到合约张数: {total_size} 张")
                 
-                # 分批下单
+                # 按最大下单量拆分子订单，根据方向设置正负
+                order_sizes = []
                 while total_size > 0:
-                    # 确定本次下单量
                     batch_size = min(total_size, max_size)
                     total_size -= batch_size
-                    
-                    # 根据方向设置正负
-                    order_size = int(batch_size) if direction == 'long' else -int(batch_size)
-                    
-                    # 创建订单对象
-                    from gate_api import FuturesOrder
-                    futures_order = FuturesOrder(
-                        contract=contract,
-                        size=str(order_size),  # 合约张数（整数）
-                        price='0',  # 市价单
-                        tif='ioc'  # 立即成交或取消
-                    )
-                    
-                    # 创建订单
-                    order = self.futures_api.create_futures_order(
-                        settle='usdt',
-                        futures_order=futures_order
-                    )
-                    
-                    if order.status == 'finished':
-                        logger.info(f"下单成功: {symbol} {order_size} 张, "
-                                  f"剩余数量: {total_size}, 订单状态: {order.status}")
-                    else:
-                        logger.error(f"下单失败: {symbol} {order_size} 张, 订单状态: {order.status}")
-                        return False
+                    order_sizes.append(int(batch_size) if direction == 'long' else -int(batch_size))
+                
+                # 一次提交所有子订单（批量或并发），汇总成交结果
+                result = self.submit_order_slices(contract, order_sizes)
+                self.last_order_result = result
                 
+                logger.info(f"下单完成: {symbol} 子订单 {result['orders']} 个（{result['mode']}）, "
+                            f"成交 {result['filled']}/{result['requested']} 张, "
+                            f"均价 {result['avg_price']}, 首末子订单耗时 {result['latency'] * 1000:.0f}ms")
+                if result['failed'] or result['skipped']:
+                    logger.error(f"下单失败: {symbol} {result['failed']} 个子订单未完成, "
+                                 f"{result['skipped']} 个子订单未提交: {result['errors']}")
+                    return False
                 return True
                 
             except Exception as e:
                 logger.error(f"下单失败: {str(e)}")
+                self._check_delisting(e, contract)
                 return False
                 
         except Exception as e:
             logger.error(f"创建订单失败: {str(e)}")
             return False
     
+    def _submit_order(self, futures_order, stop: threading.Event):
+        """提交单个订单，返回 (订单、异常或 None, 完成时间)
+
+        stop 已被设置（之前的子订单失败）时不再提交，返回 None；本订单失败时设置 stop。
+        """
+        if stop.is_set():
+            return None, time.perf_counter()
+        try:
+            order = self.call_futures_api('create_futures_order', settle='usdt', futures_order=futures_order)
+            if order.status != 'finished':
+                stop.set()
+        except Exception as e:
+            order = e
+            stop.set()
+        return order, time.perf_counter()
+
+    def submit_order_slices(self, contract: str, order_sizes: List[int]) -> dict:
+        """提交一组市价 IOC 子订单并汇总成交
+
+        多个子订单时用最多 ORDER_SUBMIT_WORKERS 个线程并发提交，避免逐个等待造成的价格漂移。
+        与逐个提交一样，某个子订单失败后不再提交尚未开始的子订单（计入 skipped），
+        但已在途的子订单（最多 ORDER_SUBMIT_WORKERS - 1 个）仍会正常完成。
+
+        Args:
+            contract: 合约名称（含 _USDT 后缀）
+            order_sizes: 各子订单张数，正数做多、负数做空
+
+        Returns:
+            汇总结果：orders 子订单数、requested/filled 请求和成交张数、avg_price 成交均价、
+            failed 未完成的子订单数、skipped 因前面失败而未提交的子订单数、errors 失败原因、
+            latency 首个子订单提交到最后一个完成的秒数、mode 提交方式
+        """
+        from gate_api import FuturesOrder
+        futures_orders = [
+            FuturesOrder(
+                contract=contract,
+                size=str(order_size),  # 合约张数（整数）
+                price='0',  # 市价单
+                tif='ioc'  # 立即成交或取消
+            )
+            for order_size in order_sizes
+        ]
+        
+        started = time.perf_counter()
+        stop = threading.Event()
+        if len(futures_orders) > 1:
+            mode = 'concurrent'
+            workers = min(len(futures_orders), Config.ORDER_SUBMIT_WORKERS)
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='order') as executor:
+                outcomes = list(executor.map(lambda order: self._submit_order(order, stop), futures_orders))
+        else:
+            mode = 'single'
+            outcomes = [self._submit_order(order, stop) for order in futures_orders]
+        
+        filled = 0
+        notional = 0.0
+        skipped = 0
+        errors = []
+        for order, _ in outcomes:
+            if order is None:
+                skipped += 1
+                continue
+            if isinstance(order, Exception):
+                self._check_delisting(order, contract)
+                errors.append(str(order))
+                continue
+            if order.status != 'finished':
+                errors.append(getattr(order, 'label', None) or f"status={order.status}")
+            filled_size = abs(int(order.size or 0)) - abs(int(order.left or 0))
+            if filled_size > 0 and order.fill_price:
+                filled += filled_size
+                notional += filled_size * float(order.fill_price)
+        
+        return {
+            'mode': mode,
+            'orders': len(futures_orders),
+            'requested': sum(abs(size) for size in order_sizes),
+            'filled': filled,
+            'avg_price': notional / filled if filled else None,
+            'failed': len(errors),
+            'skipped': skipped,
+            'errors': errors,
+            'latency': max(finished_at for _, finished_at in outcomes) - started,
+        }
+
     def close_position(self, account_info: AccountInfo, symbol: str) -> bool:
         """平仓指定品种"""
+        try:
+            return self._close_position(account_info, symbol)
+        finally:
+            position_cache.invalidate(account_info.apikey)
+
+    def _close_position(self, account_info: AccountInfo, symbol: str) -> bool:
+        """平仓的实现，见 close_position"""
         try:
             # 获取所有持仓信息（强制更新缓存）
             positions = self._get_account_positions(account_info, force_update=True)
@@ -577,7 +737,8 @@ class DataManager:
             )
             
             # 创建��仓订单
-            order = self.futures_api.create_futures_order(
+            order = self.call_futures_api(
+                'create_futures_order',
                 settle='usdt',
                 futures_order=futures_order
             )
@@ -591,6 +752,7 @@ class DataManager:
             
         except Exception as e:
             logger.error(f"平仓失败: {str(e)}")
+            self._check_delisting(e, f"{symbol}_USDT")
             return False
 
     def get_position_pnl(self, account_info: AccountInfo, symbol: str) -> Optional[float]:
@@ -686,14 +848,12 @@ class DataManager:
             List of [timestamp, open, high, low, close, volume]
         """
         try:
-            if not self.futures_api:
-                self._init_api()
-            
             # 添加 _USDT 后缀
             contract = f"{symbol}_USDT"
             
             # 使用期货K线接口
-            candlesticks = self.futures_api.list_futures_candlesticks(
+            candlesticks = self.call_futures_api(
+                'list_futures_candlesticks',
                 settle='usdt',  # 结算币种
                 contract=contract,
                 interval=interval,
@@ -708,13 +868,55 @@ class DataManager:
             return []
 
     def get_price_ranges(self, account_id: str, strategy_type: str, filters: dict) -> dict:
-        """获取价格范围数据"""
+        """获取价格范围数据
+
+        filters['interval'] 指定K线周期（1d 或 INTRADAY_RANGE_PIPELINES 中的周期），默认 1d；
+        filters['window'] 指定该周期下的窗口（K线根数），日线默认 PRICE_RANGE_DAYS，日内周期默认最短窗口。
+        非默认窗口的最高/最低价取自 price_range_window，振幅和位置比按 price_range_20d 中的最新价计算，
+        返回字段名与默认窗口保持一致。
+        """
+        interval = filters.get('interval') or '1d'
+        if interval == '1d':
+            windows = set(Config.PRICE_RANGE_WINDOWS) | {Config.PRICE_RANGE_DAYS}
+            default_window = Config.PRICE_RANGE_DAYS
+        elif interval in Config.INTRADAY_RANGE_PIPELINES:
+            windows = set(Config.INTRADAY_RANGE_PIPELINES[interval]['windows'])
+            default_window = min(windows)
+        else:
+            raise ValueError(f"不支持的K线周期: {interval}")
+        window = filters.get('window') or default_window
+        if window not in windows:
+            raise ValueError(f"{interval} 周期不支持的窗口: {window}")
+        
         try:
             with self.db_connection.get_connection() as conn:
                 with conn.cursor() as cursor:
                     # 构建查询条件
                     conditions = ['1=1']  # 始终为真的条件
                     params = []
+                    
+                    # 数据来源：日线默认窗口直接查询 price_range_20d，其他周期和窗口关联 price_range_window
+                    source = 'price_range_20d'
+                    source_params = []
+                    if interval != '1d' or window != Config.PRICE_RANGE_DAYS:
+                        source = """(
+                            SELECT
+                                p.symbol,
+                                w.high_price AS high_price_20d,
+                                w.low_price AS low_price_20d,
+                                p.last_price,
+                                CASE WHEN w.low_price > 0
+                                     THEN (w.high_price - w.low_price) / w.low_price ELSE 0 END AS amplitude,
+                                CASE WHEN w.high_price > w.low_price
+                                     THEN (p.last_price - w.low_price) / (w.high_price - w.low_price) ELSE 0 END AS position_ratio,
+                                p.volume_24h,
+                                p.update_date,
+                                p.update_time
+                            FROM price_range_20d p
+                            JOIN price_range_window w
+                              ON w.symbol = p.symbol AND w.`interval` = %s AND w.window_days = %s
+                        ) AS ranges"""
+                        source_params.extend([interval, window])
 
                     # 获取最新日期
                     cursor.execute("SELECT MAX(update_date) as latest_date FROM price_range_20d")
@@ -756,6 +958,7 @@ class DataManager:
 
                     # 添加调试日志
                     logger.debug("筛选条件:")
+                    logger.debug(f"- 周期/窗口: {interval}/{window}")
                     logger.debug(f"- 位置范围: {filters.get('min_position')} - {filters.get('max_position')}")
                     logger.debug(f"- SQL条件: {where_clause}")
                     logger.debug(f"- 参数: {params}")
@@ -763,10 +966,10 @@ class DataManager:
                     # 获取总数
                     count_sql = f"""
                         SELECT COUNT(*) as total
-                        FROM price_range_20d
+                        FROM {source}
                         WHERE {where_clause}
                     """
-                    cursor.execute(count_sql, params)
+                    cursor.execute(count_sql, source_params + params)
                     total = cursor.fetchone()['total']
 
                     # 获取分页数据
@@ -781,12 +984,12 @@ class DataManager:
                             position_ratio * 100 as position_ratio,
                             volume_24h,
                             update_time
-                        FROM price_range_20d
+                        FROM {source}
                         WHERE {where_clause}
                         ORDER BY volume_24h DESC
                         LIMIT %s OFFSET %s
                     """
-                    cursor.execute(data_sql, params + [filters['per_page'], offset])
+                    cursor.execute(data_sql, source_params + params + [filters['per_page'], offset])
                     data = cursor.fetchall()
 
                     # 添加调试日志
@@ -804,6 +1007,16 @@ class DataManager:
             logger.exception("详细��误信息：")
             raise
 
+    def get_price_range_history(self, symbol: str, days: int) -> List[dict]:
+        """获取品种最近 days 天的价格范围历史快照"""
+        try:
+            end_date = date.today()
+            start_date = end_date - timedelta(days=days)
+            return PriceRangeHistoryStore(self.db_connection).load(symbol, start_date, end_date)
+        except Exception as e:
+            logger.error(f"获取{symbol}的价格范围历史失败: {str(e)}")
+            raise
+
     def get_monitor_symbols(self, account_id: str) -> List[dict]:
         """获取监控列表数据"""
         try:
@@ -2,12 +2,58 @@ from typing import List, Optional, Dict
 import pymysql
 from flask import current_app
 from contextlib import contextmanager
+from app import db
 from app.models import AccountInfo, ProductInfo
 import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+class PooledConnection:
+    """SQLAlchemy 连接池中原生 pymysql 连接的代理
+
+    cursor() 默认返回 DictCursor，与原先直接创建的连接一致；其余属性透传给底层连接。
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self, cursor_class=pymysql.cursors.DictCursor):
+        return self._connection.cursor(cursor_class)
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+
+def get_engine(server_id: str):
+    """获取数据库服务器（如 server1）对应的 SQLAlchemy 引擎
+
+    默认服务器（Config.DEFAULT_DATABASE）使用 Flask-SQLAlchemy 的默认引擎，其他服务器使用
+    SQLALCHEMY_BINDS 中同名的引擎。ORM 会话和原生 SQL 共用同一个连接池，
+    连接池参数统一在 SQLALCHEMY_ENGINE_OPTIONS 中配置。
+    """
+    if server_id not in current_app.config['DATABASES']:
+        raise ValueError(f"未知的数据库服务器: {server_id}")
+    bind_key = None if server_id == current_app.config['DEFAULT_DATABASE'] else server_id
+    return db.engines[bind_key]
+
+
+def pool_stats() -> List[Dict]:
+    """各数据库服务器连接池的指标"""
+    stats = []
+    for server_id in current_app.config['DATABASES']:
+        pool = get_engine(server_id).pool
+        stats.append({
+            'name': server_id,
+            'size': pool.size(),
+            'checked_out': pool.checkedout(),
+            'idle': pool.checkedin(),
+            'overflow': pool.overflow(),
+        })
+    return stats
+
+
 class DatabaseConnection:
     def __init__(self, server_id: str):
         self.server_id = f'server{server_id}'
@@ -22,25 +68,13 @@ class DatabaseConnection:
         
     @contextmanager
     def get_connection(self):
-        """获取数据库连接"""
+        """从服务器对应的 SQLAlchemy 连接池获取原生数据库连接
+
+        正常退出时提交事务，发生异常时回滚并抛出，随后连接归还连接池。
+        """
         connection = None
         try:
-            # 获取数据库配置
-            db_config = self.get_db_config()
-            
-            # 创建数据库连接
-            connection = pymysql.connect(
-                host=db_config['HOST'],
-                user=db_config['USER'],
-                password=db_config['PASSWORD'],
-                database=db_config['NAME'],
-                port=db_config['PORT'],
-                charset='utf8mb4',
-                cursorclass=pymysql.cursors.DictCursor,
-                connect_timeout=5,
-                read_timeout=30,
-                write_timeout=30
-            )
+            connection = PooledConnection(get_engine(self.server_id).raw_connection())
             
             yield connection
             connection.commit()  # 如果没有异常，提交事务
@@ -53,7 +87,7 @@ class DatabaseConnection:
             
         finally:
             if connection:
-                connection.close()  # 确保连接被关闭
+                connection.close()  # 归还连接池（归还时由连接池重置未结束的事务）
 
 class DatabaseManager:
     @staticmethod
@@ -74,65 +108,68 @@ class DatabaseManager:
 
     @staticmethod
     def get_account_info(server_id: str, username: str) -> List[AccountInfo]:
-        """获取用户的所有账户信息"""
+        """获取用户的所有账户信息
+
+        在同一个连接上用两次查询完成：第一次联表获取用户关联的账户，
+        第二次一次性获取这些账户的全部产品组合，再在内存中按账户分组。
+        """
         db = DatabaseConnection(server_id)
-        account_info_list = []
         
-        # 首先获取用户关联的所有账户ID
-        acct_ids = DatabaseManager.get_user_accounts(server_id, username)
-        if not acct_ids:
-            return []
-            
         with db.get_connection() as conn:
             with conn.cursor() as cursor:
-                # 获取所有关联账户的基本信息
+                # 获取用户关联的所有账户的基本信息
                 cursor.execute("""
-                    SELECT acct_id, acct_name, apikey, secretkey, apipass, 
-                           email, group_id, state, status
-                    FROM acct_info
-                    WHERE acct_id IN (%s)
-                """ % ','.join(['%s'] * len(acct_ids)), tuple(acct_ids))
+                    SELECT DISTINCT ai.acct_id, ai.acct_name, ai.apikey, ai.secretkey, ai.apipass,
+                           ai.email, ai.group_id, ai.state, ai.status
+                    FROM users u
+                    JOIN user_accounts ua ON u.id = ua.user_id
+                    JOIN acct_info ai ON ua.acct_id = ai.acct_id
+                    WHERE u.username = %s AND ai.group_id = 3
+                """, (username,))
                 accounts_data = cursor.fetchall()
+                if not accounts_data:
+                    return []
                 
-                # 获取所有关联账户的产品组合信息
-                for account in accounts_data:
-                    cursor.execute("""
-                        SELECT asg.product_list, asg.name, asg.status,
-                               asg.money, asg.discount,
-                               scp.comb_name
-                        FROM acct_stg_future_gateio asg
-                        LEFT JOIN stg_comb_product_gateio scp 
-                            ON asg.product_list = scp.product_comb
-                        WHERE asg.acct_id = %s
-                    """, (account['acct_id'],))
-                    product_data = cursor.fetchall()
-                    
-                    products = [
-                        ProductInfo(
-                            product_list=row['product_list'],
-                            name=row['name'],
-                            status=row['status'],
-                            comb_name=row['comb_name'] if row['comb_name'] else '',
-                            money=float(row['money']) if row['money'] is not None else 0.0,
-                            discount=float(row['discount']) if row['discount'] is not None else 0.0
-                        )
-                        for row in product_data
-                    ]
-                    
-                    account_info_list.append(AccountInfo(
-                        acct_id=str(account['acct_id']),
-                        acct_name=account['acct_name'],
-                        apikey=account['apikey'],
-                        secretkey=account['secretkey'],
-                        apipass=account['apipass'],
-                        email=account['email'],
-                        group_id=account['group_id'],
-                        state=account['state'],
-                        status=account['status'],
-                        stg_comb_product_gateio=products
-                    ))
-                
-        return account_info_list
+                # 一次获取所有关联账户的产品组合信息
+                acct_ids = [account['acct_id'] for account in accounts_data]
+                cursor.execute("""
+                    SELECT asg.acct_id, asg.product_list, asg.name, asg.status,
+                           asg.money, asg.discount,
+                           scp.comb_name
+                    FROM acct_stg_future_gateio asg
+                    LEFT JOIN stg_comb_product_gateio scp 
+                        ON asg.product_list = scp.product_comb
+                    WHERE asg.acct_id IN (%s)
+                """ % ','.join(['%s'] * len(acct_ids)), tuple(acct_ids))
+                product_data = cursor.fetchall()
+        
+        # 按账户分组产品组合
+        products_by_account = {}
+        for row in product_data:
+            products_by_account.setdefault(str(row['acct_id']), []).append(ProductInfo(
+                product_list=row['product_list'],
+                name=row['name'],
+                status=row['status'],
+                comb_name=row['comb_name'] if row['comb_name'] else '',
+                money=float(row['money']) if row['money'] is not None else 0.0,
+                discount=float(row['discount']) if row['discount'] is not None else 0.0
+            ))
+        
+        return [
+            AccountInfo(
+                acct_id=str(account['acct_id']),
+                acct_name=account['acct_name'],
+                apikey=account['apikey'],
+                secretkey=account['secretkey'],
+                apipass=account['apipass'],
+                email=account['email'],
+                group_id=account['group_id'],
+                state=account['state'],
+                status=account['status'],
+                stg_comb_product_gateio=products_by_account.get(str(account['acct_id']), [])
+            )
+            for account in accounts_data
+        ]
 
     @staticmethod
     def create_user(server_id: str, username: str, email: str, password_hash: str) -> Optional[int]:
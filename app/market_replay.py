@@ -0,0 +1,273 @@
+import atexit
+import gzip
+import hashlib
+import inspect
+import itertools
+import json
+import os
+import threading
+import time
+from bisect import bisect_right
+from types import SimpleNamespace
+from typing import Optional, Tuple
+from gate_api import FuturesApi
+from gate_api.exceptions import ApiException
+from app import setup_logging
+from config import Config
+
+logger = setup_logging(
+    'market_replay',
+    os.path.join('logs', 'market_replay.log')
+)
+
+# 录制的只读接口及用于区分响应的参数
+RECORDED_ENDPOINTS = {
+    'list_futures_tickers': ('contract',),
+    'list_futures_candlesticks': ('contract', 'interval'),
+    'list_futures_contracts': (),
+    'get_futures_contract': ('contract',),
+    'list_positions': (),
+}
+
+
+def account_label(api_key: Optional[str]) -> Optional[str]:
+    """API Key 的摘要，录制文件中不保存原始 Key"""
+    if not api_key:
+        return None
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:12]
+
+
+def _bind_params(endpoint: str, args: tuple, kwargs: dict) -> dict:
+    """按 FuturesApi 方法签名把位置参数和关键字参数合并为参数字典"""
+    bound = inspect.signature(getattr(FuturesApi, endpoint)).bind(None, *args, **kwargs)
+    params = dict(bound.arguments)
+    params.pop('self', None)
+    params.update(params.pop('kwargs', {}))
+    return params
+
+
+def _request_key(endpoint: str, account: Optional[str], params: dict) -> Tuple:
+    key_params = RECORDED_ENDPOINTS[endpoint]
+    account = account if endpoint == 'list_positions' else None
+    return (endpoint, account) + tuple(str(params.get(name)) if params.get(name) is not None else None
+                                       for name in key_params)
+
+
+def _to_plain(result):
+    """将 gate_api 模型转换为可 JSON 序列化的结构"""
+    if isinstance(result, list):
+        return [_to_plain(item) for item in result]
+    if hasattr(result, 'to_dict'):
+        return result.to_dict()
+    return result
+
+
+def _to_object(data):
+    """将录制的结构还原为支持属性访问的对象"""
+    if isinstance(data, list):
+        return [_to_object(item) for item in data]
+    if isinstance(data, dict):
+        return SimpleNamespace(**data)
+    return data
+
+
+class MarketRecorder:
+    """将接口响应追加写入 gzip 压缩的 JSON Lines 文件（线程安全）"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = gzip.open(path, 'at', encoding='utf-8')
+        self._lock = threading.Lock()
+        self.count = 0
+        atexit.register(self.close)
+
+    def record(self, endpoint: str, account: Optional[str], params: dict, result):
+        line = json.dumps({
+            'time': time.time(),
+            'endpoint': endpoint,
+            'account': account,
+            'params': {name: value for name, value in params.items() if isinstance(value, (str, int, float, bool))},
+            'result': _to_plain(result),
+        }, ensure_ascii=False, default=str)
+        with self._lock:
+            self._file.write(line + '\n')
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+                logger.info(f"录制结束，共 {self.count} 条响应: {self.path}")
+
+
+class RecordingFuturesApi:
+    """FuturesApi 代理：正常调用交易所，并录制只读接口的响应"""
+
+    def __init__(self, futures_api, recorder: MarketRecorder, api_key: Optional[str] = None):
+        self._futures_api = futures_api
+        self._recorder = recorder
+        self._account = account_label(api_key)
+
+    def __getattr__(self, endpoint):
+        method = getattr(self._futures_api, endpoint)
+        if endpoint not in RECORDED_ENDPOINTS:
+            return method
+
+        def call(*args, **kwargs):
+            result = method(*args, **kwargs)
+            params = _bind_params(endpoint, args, kwargs)
+            self._recorder.record(endpoint, self._account, params, result)
+            return result
+        return call
+
+
+class ReplayClock:
+    """回放时钟：从录制开始时间起按 speed 倍速前进
+
+    speed 不大于0时为步进模式：每次获取行情前进到下一次录制的行情，结果与耗时无关。
+    """
+
+    def __init__(self, start_time: float, speed: float = 1.0):
+        self.start_time = start_time
+        self.speed = speed
+        self._started = time.monotonic()
+        self._step_time = start_time - 1  # 步进模式下第一次获取行情前进到首次录制
+
+    @property
+    def stepping(self) -> bool:
+        return self.speed <= 0
+
+    def now(self) -> float:
+        if self.stepping:
+            return self._step_time
+        return self.start_time + (time.monotonic() - self._started) * self.speed
+
+    def advance_to(self, recorded_time: float):
+        self._step_time = max(self._step_time, recorded_time)
+
+
+class MarketReplay:
+    """加载录制文件，按回放时钟返回对应时刻的响应"""
+
+    def __init__(self, path: str, speed: float = 1.0):
+        self.path = path
+        self._responses = {}  # 请求键 -> ([录制时间], [响应])
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                entry = json.loads(line)
+                key = _request_key(entry['endpoint'], entry.get('account'), entry['params'])
+                times, results = self._responses.setdefault(key, ([], []))
+                times.append(entry['time'])
+                results.append(entry['result'])
+        if not self._responses:
+            raise ValueError(f"录制文件为空: {path}")
+        start_time = min(times[0] for times, _ in self._responses.values())
+        self.end_time = max(times[-1] for times, _ in self._responses.values())
+        self.clock = ReplayClock(start_time, speed)
+        self._lock = threading.Lock()
+        self._last_prices = {}
+        logger.info(f"加载录制文件 {path}: {len(self._responses)} 类请求，"
+                    f"时长 {self.end_time - start_time:.0f} 秒，回放速度 {speed or '步进'}")
+
+    @property
+    def finished(self) -> bool:
+        """回放时钟是否已越过最后一条录制"""
+        return self.clock.now() >= self.end_time
+
+    def lookup(self, endpoint: str, account: Optional[str], params: dict):
+        """返回回放时钟之前最近一次录制的响应，时钟早于首次录制时返回首次录制"""
+        key = _request_key(endpoint, account, params)
+        if key not in self._responses:
+            raise ApiException(status=404, reason=f"录制中没有该请求: {key}")
+        times, results = self._responses[key]
+        with self._lock:
+            if self.clock.stepping and endpoint == 'list_futures_tickers':
+                # 步进模式：每次获取行情前进到下一次录制
+                index = bisect_right(times, self.clock.now())
+                if index < len(times):
+                    self.clock.advance_to(times[index])
+            index = max(bisect_right(times, self.clock.now()) - 1, 0)
+        result = results[index]
+        if endpoint == 'list_futures_tickers':
+            self._last_prices.update({ticker['contract']: ticker['last'] for ticker in result})
+        return _to_object(result)
+
+    def last_price(self, contract: str) -> Optional[str]:
+        return self._last_prices.get(contract)
+
+
+class ReplayFuturesApi:
+    """回放录制数据的 FuturesApi 替身
+
+    只读接口返回录制的响应；下单和调整杠杆不访问交易所，
+    按最近回放的行情价格立即全部成交。
+    """
+
+    rate_limited = False  # 不经过交易所限流器
+
+    def __init__(self, replay: MarketReplay, api_key: Optional[str] = None):
+        self._replay = replay
+        self._account = account_label(api_key)
+        self._order_ids = itertools.count(1)  # 拆分子订单会并发提交，next() 保证编号不重复
+
+    def __getattr__(self, endpoint):
+        if endpoint not in RECORDED_ENDPOINTS:
+            raise AttributeError(endpoint)
+
+        def call(*args, **kwargs):
+            return self._replay.lookup(endpoint, self._account, _bind_params(endpoint, args, kwargs))
+        return call
+
+    def update_position_leverage(self, settle, contract, leverage, **kwargs):
+        return SimpleNamespace(contract=contract, leverage=leverage)
+
+    def create_futures_order(self, settle, futures_order, **kwargs):
+        return SimpleNamespace(
+            id=next(self._order_ids),
+            contract=futures_order.contract,
+            size=futures_order.size,
+            left=0,
+            status='finished',
+            finish_as='filled',
+            fill_price=self._replay.last_price(futures_order.contract) or futures_order.price,
+            create_time=self._replay.clock.now(),
+        )
+
+
+_recorder = None
+_replay = None
+_lock = threading.Lock()
+
+
+def get_replay() -> Optional[MarketReplay]:
+    """回放模式下返回进程共享的回放数据（首次调用时加载）"""
+    global _replay
+    if Config.MARKET_REPLAY_MODE != 'replay':
+        return None
+    with _lock:
+        if _replay is None:
+            _replay = MarketReplay(Config.MARKET_REPLAY_FILE, Config.MARKET_REPLAY_SPEED)
+        return _replay
+
+
+def wrap_futures_api(futures_api, api_key: Optional[str] = None):
+    """按 MARKET_REPLAY_MODE 包装 DataManager 的 FuturesApi
+
+    record：调用交易所并录制只读接口响应；replay：返回回放替身，不访问交易所；
+    未设置时原样返回。
+    """
+    global _recorder
+    mode = Config.MARKET_REPLAY_MODE
+    if not mode:
+        return futures_api
+    if mode == 'record':
+        with _lock:
+            if _recorder is None:
+                _recorder = MarketRecorder(Config.MARKET_REPLAY_FILE)
+                logger.info(f"开始录制接口响应: {Config.MARKET_REPLAY_FILE}")
+        return RecordingFuturesApi(futures_api, _recorder, api_key)
+    if mode == 'replay':
+        return ReplayFuturesApi(get_replay(), api_key)
+    raise ValueError(f"未知的 MARKET_REPLAY_MODE: {mode}")
@@ -119,6 +119,86 @@ class PriceRange20d(db.Model):
     def __repr__(self):
         return f'<PriceRange20d {self.symbol}>'
 
+class OhlcvCandle(db.Model):
+    """本地K线存储"""
+    __tablename__ = 'ohlcv_candle'
+    
+    id = db.Column(db.BigInteger, primary_key=True)
+    symbol = db.Column(db.String(20), nullable=False)  # 品种代码（不含 _USDT 后缀）
+    interval = db.Column(db.String(10), nullable=False)  # K线周期：1d/4h/1h
+    timestamp = db.Column(db.BigInteger, nullable=False)  # K线开始时间（秒）
+    open = db.Column(db.DECIMAL(20, 8), nullable=False)
+    high = db.Column(db.DECIMAL(20, 8), nullable=False)
+    low = db.Column(db.DECIMAL(20, 8), nullable=False)
+    close = db.Column(db.DECIMAL(20, 8), nullable=False)
+    volume = db.Column(db.DECIMAL(30, 8), default=0)
+    
+    __table_args__ = (
+        db.UniqueConstraint('symbol', 'interval', 'timestamp', name='uix_candle_symbol_interval_ts'),
+    )
+    
+    def __repr__(self):
+        return f'<OhlcvCandle {self.symbol}:{self.interval}:{self.timestamp}>'
+
+class PriceRangeState(db.Model):
+    """滚动极值状态（单调队列的持久化）"""
+    __tablename__ = 'price_range_state'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    symbol = db.Column(db.String(20), nullable=False)
+    interval = db.Column(db.String(10), nullable=False, default='1d')
+    last_timestamp = db.Column(db.BigInteger)  # 最后一根K线时间戳
+    state = db.Column(db.Text, nullable=False)  # RollingExtrema 序列化后的 JSON
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+    
+    __table_args__ = (
+        db.UniqueConstraint('symbol', 'interval', name='uix_range_state_symbol_interval'),
+    )
+    
+    def __repr__(self):
+        return f'<PriceRangeState {self.symbol}:{self.interval}>'
+
+class PriceRangeWindow(db.Model):
+    """多窗口价格范围（由同一份K线按 PRICE_RANGE_WINDOWS 计算）"""
+    __tablename__ = 'price_range_window'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    symbol = db.Column(db.String(20), nullable=False)
+    interval = db.Column(db.String(10), nullable=False, default='1d')
+    window_days = db.Column(db.Integer, nullable=False)  # 窗口长度（K线根数）
+    high_price = db.Column(db.DECIMAL(20, 8), nullable=False)
+    low_price = db.Column(db.DECIMAL(20, 8), nullable=False)
+    last_price = db.Column(db.DECIMAL(20, 8), nullable=False)  # 计算时的最新收盘价
+    amplitude = db.Column(db.DECIMAL(20, 8), nullable=False)
+    update_date = db.Column(db.Date, nullable=False)
+    update_time = db.Column(db.DateTime, nullable=False, default=datetime.now, onupdate=datetime.now)
+    
+    __table_args__ = (
+        db.UniqueConstraint('symbol', 'interval', 'window_days', name='uix_range_window_symbol_interval_days'),
+    )
+    
+    def __repr__(self):
+        return f'<PriceRangeWindow {self.symbol}:{self.interval}:{self.window_days}>'
+
+class PriceRangeCheckpoint(db.Model):
+    """每日价格范围更新的逐品种进度（用于断点续跑）"""
+    __tablename__ = 'price_range_checkpoint'
+    
+    id = db.Column(db.BigInteger, primary_key=True)
+    run_date = db.Column(db.Date, nullable=False)  # 运行日期
+    interval = db.Column(db.String(10), nullable=False, default='1d')
+    symbol = db.Column(db.String(20), nullable=False)
+    status = db.Column(db.String(20), nullable=False)  # done / insufficient / no_data
+    volume_24h = db.Column(db.DECIMAL(20, 8))  # 价格范围更新清零前的24小时成交量，供历史快照使用
+    updated_at = db.Column(db.DateTime, default=datetime.now, onupdate=datetime.now)
+    
+    __table_args__ = (
+        db.UniqueConstraint('run_date', 'interval', 'symbol', name='uix_checkpoint_date_interval_symbol'),
+    )
+    
+    def __repr__(self):
+        return f'<PriceRangeCheckpoint {self.run_date}:{self.interval}:{self.symbol}>'
+
 class SyncStatus(str, Enum):
     """同步状态枚举"""
     WAITING = 'WAITING'      # 等待开仓
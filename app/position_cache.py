@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+from config import Config
+
+
+class PositionCache:
+    """进程级账户持仓缓存
+
+    按账户（API Key）分别记录过期时间，互不影响；超过 max_entries 时淘汰最久未使用的账户。
+    下单或平仓后应调用 invalidate，使该账户的下一次查询重新获取持仓。
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        """
+        Args:
+            ttl: 每个账户持仓的有效期（秒）
+            max_entries: 最多缓存的账户数
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # 账户键 -> (持仓列表, 过期时间)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[List]:
+        """返回未过期的持仓，不存在或已过期时返回 None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] <= time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key: str, positions: List, ttl: Optional[float] = None):
+        """写入账户持仓"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (positions, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: str):
+        """删除账户持仓，下一次查询重新获取"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# 所有 DataManager 实例共享的持仓缓存
+position_cache = PositionCache(Config.POSITION_CACHE_TTL, Config.POSITION_CACHE_SIZE)
+
+
+class LeverageCache:
+    """进程级杠杆状态缓存
+
+    按 (账户, 合约) 记录当前杠杆，来源为持仓数据和成功的杠杆设置，
+    下单前杠杆未变化时可以跳过 update_position_leverage。超过 ttl 的记录视为未知，
+    以防杠杆在其他终端被修改。
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._entries = {}  # (账户键, 合约) -> (杠杆, 过期时间)
+        self._lock = threading.Lock()
+
+    def get(self, key: str, contract: str) -> Optional[int]:
+        """返回已知的杠杆，未知或已过期时返回 None"""
+        with self._lock:
+            entry = self._entries.get((key, contract))
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        return entry[0]
+
+    def set(self, key: str, contract: str, leverage: int):
+        with self._lock:
+            self._entries[(key, contract)] = (int(leverage), time.monotonic() + self.ttl)
+
+    def seed(self, key: str, positions: List):
+        """用 list_positions 的结果更新该账户各合约的杠杆"""
+        for position in positions or []:
+            if getattr(position, 'leverage', None) not in (None, ''):
+                self.set(key, position.contract, int(float(position.leverage)))
+
+    def invalidate(self, key: str, contract: str):
+        with self._lock:
+            self._entries.pop((key, contract), None)
+
+
+# 所有 DataManager 实例共享的杠杆缓存
+leverage_cache = LeverageCache(Config.LEVERAGE_CACHE_TTL)
@@ -0,0 +1,64 @@
+from typing import Dict, List, Tuple
+import numpy as np
+
+
+def build_close_matrix(close_series: Dict[str, List[float]], window: int) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """将各品种的收盘价排成二维矩阵
+
+    每行对应一个品种，取最近 window 根K线并右对齐，不足部分以 NaN 填充。
+
+    Returns:
+        (symbols, closes, mask)：closes 形状为 (品种数, window) 的 float64 矩阵，
+        mask 标记K线数量达到 window 的品种
+    """
+    symbols = list(close_series.keys())
+    closes = np.full((len(symbols), window), np.nan, dtype=np.float64)
+    mask = np.zeros(len(symbols), dtype=bool)
+    for row, symbol in enumerate(symbols):
+        series = close_series[symbol][-window:]
+        if series:
+            closes[row, window - len(series):] = series
+        mask[row] = len(series) >= window
+    return symbols, closes, mask
+
+
+def compute_tick_metrics(high: np.ndarray, low: np.ndarray, last: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """按最新价批量计算振幅和位置比例
+
+    与逐品种计算的规则一致：最低价不大于0时振幅为0，区间宽度为0时位置比例为0。
+    """
+    spread = high - low
+    with np.errstate(divide='ignore', invalid='ignore'):
+        amplitude = np.where(low > 0, spread / low, 0.0)
+        position_ratio = np.where(spread > 0, (last - low) / spread, 0.0)
+    return amplitude, position_ratio
+
+
+def compute_price_ranges(closes: np.ndarray, mask: np.ndarray) -> Dict[str, np.ndarray]:
+    """一次向量化计算所有品种的最高价、最低价、振幅和位置比例
+
+    Args:
+        closes: build_close_matrix 生成的收盘价矩阵
+        mask: 有效品种掩码，无效行的结果为 NaN
+
+    Returns:
+        字段名到一维数组的映射，字段与 PriceUpdater.calculate_price_range 的结果一致
+    """
+    valid = closes[mask]
+    high = np.full(len(closes), np.nan)
+    low = np.full(len(closes), np.nan)
+    last = np.full(len(closes), np.nan)
+    if len(valid):
+        high[mask] = valid.max(axis=1)
+        low[mask] = valid.min(axis=1)
+        last[mask] = valid[:, -1]
+    amplitude, position_ratio = compute_tick_metrics(high, low, last)
+    amplitude[~mask] = np.nan
+    position_ratio[~mask] = np.nan
+    return {
+        'high_price_20d': high,
+        'low_price_20d': low,
+        'last_price': last,
+        'amplitude': amplitude,
+        'position_ratio': position_ratio,
+    }
@@ -1,7 +1,9 @@
 import sys
 import os
 import time
+import hashlib
 import schedule
+import numpy as np
 from datetime import datetime, timedelta, date
 import pymysql
 from typing import Dict, List, Optional
@@ -9,7 +11,9 @@ import logging
 from logging.handlers import RotatingFileHandler
 from decimal import Decimal
 from sqlalchemy import text  # 添加这行导入
+from sqlalchemy.dialects.mysql import insert as mysql_insert
 import codecs
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from app import setup_logging
 from config import Config
 
@@ -24,7 +28,12 @@ from app.data_manager import DataManager
 from app.database import DatabaseConnection, DatabaseManager
 from flask import current_app
 from app import create_app, db
-from app.models import PriceRange20d
+from app.models import PriceRange20d, PriceRangeWindow, PriceRangeCheckpoint
+from app.candle_store import CandleStore, INTERVAL_SECONDS
+from app.rolling_extrema import RollingExtrema, RollingExtremaStore
+from app.bulk_writer import PriceTickWriter, TickChangeTracker
+from app.range_history import PriceRangeHistoryStore
+from app.price_range_batch import build_close_matrix, compute_price_ranges, compute_tick_metrics
 
 # 配置日志
 logger = setup_logging(
@@ -38,12 +47,74 @@ class PriceUpdater:
         self.db_connection = None
         self.data_manager = None
         self.price_range_days = Config.PRICE_RANGE_DAYS
+        self.fetch_workers = Config.PRICE_FETCH_WORKERS
+        self.candle_store = CandleStore()
+        self.range_state_store = RollingExtremaStore()
+        self.tick_writer = None
+        self.history_store = None
+        self._config_fingerprint = None
+        self._config_checked_at = 0.0
+        self.tick_tracker = TickChangeTracker(Config.TICK_CHANGE_EPSILON, Config.TICK_HEARTBEAT_SECONDS)
+        self.last_write_metrics = None
+        self._stream_fallback_at = 0.0  # 推送行情模式下最近一次改用 REST 行情的时间
+        self.pipeline_status = {}  # 日内流水线最近一次运行的状态
+        self.range_windows = sorted(set(Config.PRICE_RANGE_WINDOWS) | {self.price_range_days})
+        self.state_days = max(self.range_windows)  # K线获取和滚动极值状态都按最长窗口
         
     def init_connections(self):
         """初始化数据库连接和API管理器"""
         self.db_connection = DatabaseConnection('2')  # 使用服务器1的配置
+        self.tick_writer = PriceTickWriter(self.db_connection)
+        self.history_store = PriceRangeHistoryStore(self.db_connection)
         self.init_api_credentials()
 
+    def ensure_connections(self):
+        """确保连接已初始化，供常驻进程复用
+
+        已初始化时只按 UPDATER_CONFIG_CHECK_SECONDS 间隔检查账户配置，
+        配置发生变化才重新初始化。
+        """
+        if not self.data_manager:
+            self.init_connections()
+            return
+        
+        if time.monotonic() - self._config_checked_at < Config.UPDATER_CONFIG_CHECK_SECONDS:
+            return
+        
+        fingerprint = self._account_fingerprint(self._fetch_account_data())
+        self._config_checked_at = time.monotonic()
+        if fingerprint != self._config_fingerprint:
+            logger.info("检测到账户配置变化，重新初始化连接")
+            self.init_connections()
+
+    def reset(self):
+        """丢弃已初始化的连接，下次使用时重新初始化（用于故障恢复）"""
+        self.db_connection = None
+        self.data_manager = None
+        self.tick_writer = None
+        self.history_store = None
+        self._config_fingerprint = None
+
+    @staticmethod
+    def _account_fingerprint(account_data: dict) -> str:
+        """账户配置指纹，用于判断配置是否变化"""
+        return hashlib.sha256(repr(sorted(account_data.items())).encode('utf-8')).hexdigest()
+
+    def _fetch_account_data(self) -> dict:
+        """从数据库读取行情账户的配置"""
+        with self.get_db_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT acct_id, acct_name, apikey, secretkey, apipass, 
+                           email, group_id, state, status
+                    FROM acct_info
+                    WHERE acct_id = 55
+                """)
+                account_data = cursor.fetchone()
+                if not account_data:
+                    raise ValueError("Account 55 not found")
+                return account_data
+
     def get_db_connection(self):
         """获取数据库连接"""
         if not self.db_connection:
@@ -53,37 +124,29 @@ class PriceUpdater:
     def init_api_credentials(self):
         """从数据库获取API凭证"""
         try:
-            with self.get_db_connection() as conn:
-                with conn.cursor() as cursor:
-                    cursor.execute("""
-                        SELECT acct_id, acct_name, apikey, secretkey, apipass, 
-                               email, group_id, state, status
-                        FROM acct_info
-                        WHERE acct_id = 55
-                    """)
-                    account_data = cursor.fetchone()
-                    if not account_data:
-                        raise ValueError("Account 55 not found")
-
-                    # 创建 AccountInfo 对象，对敏感信息进行脱敏处理
-                    from app.models import AccountInfo
-                    account_info = AccountInfo(
-                        acct_id=str(account_data['acct_id']),
-                        acct_name=account_data['acct_name'],
-                        apikey='*' * len(account_data['apikey']),  # 脱敏处理
-                        secretkey='*' * len(account_data['secretkey']),  # 脱敏处理
-                        apipass='*' * len(account_data['apipass']),  # 脱敏处理
-                        email=account_data['email'],
-                        group_id=account_data['group_id'],
-                        state=account_data['state'],
-                        status=account_data['status'],
-                        stg_comb_product_gateio=[]
-                    )
+            account_data = self._fetch_account_data()
+
+            # 创建 AccountInfo 对象，对敏感信息进行脱敏处理
+            from app.models import AccountInfo
+            account_info = AccountInfo(
+                acct_id=str(account_data['acct_id']),
+                acct_name=account_data['acct_name'],
+                apikey='*' * len(account_data['apikey']),  # 脱敏处理
+                secretkey='*' * len(account_data['secretkey']),  # 脱敏处理
+                apipass='*' * len(account_data['apipass']),  # 脱敏处理
+                email=account_data['email'],
+                group_id=account_data['group_id'],
+                state=account_data['state'],
+                status=account_data['status'],
+                stg_comb_product_gateio=[]
+            )
 
-                    # 初始化 DataManager
-                    self.data_manager = DataManager('2')
-                    self.data_manager.account_info = account_info
-                    logger.debug("API credentials initialized")
+            # 初始化 DataManager
+            self.data_manager = DataManager('2')
+            self.data_manager.account_info = account_info
+            self._config_fingerprint = self._account_fingerprint(account_data)
+            self._config_checked_at = time.monotonic()
+            logger.debug("API credentials initialized")
         except Exception as e:
             logger.error(f"Failed to get API credentials: {str(e)}")
             raise
@@ -99,23 +162,54 @@ class PriceUpdater:
             logger.error(f"获取合约列表失败: {str(e)}")
             return []
 
-    def get_ohlcv_data(self, symbol: str) -> Optional[List]:
-        """获取指定合约的K线数据"""
+    def _get_candle_window(self, interval: str = '1d'):
+        """计算K线窗口的起止时间戳
+
+        日线截止到今天0点；日内周期截止到最后一根已收盘K线，窗口为该周期的最长窗口。
+        """
+        if interval != '1d':
+            seconds = INTERVAL_SECONDS[interval]
+            bars = max(Config.INTRADAY_RANGE_PIPELINES[interval]['windows'])
+            end_timestamp = int(time.time()) // seconds * seconds - seconds
+            return end_timestamp - (bars - 1) * seconds, end_timestamp
+        
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        yesterday = today - timedelta(days=1)
+        start_date = yesterday - timedelta(days=self.state_days-1)  # 减1是因为包含昨天
+        return int(start_date.timestamp()), int(today.timestamp())
+
+    def fetch_candles(self, symbol: str, last_timestamp: Optional[int] = None,
+                      interval: str = '1d') -> Optional[List]:
+        """从交易所获取本地尚未存储的K线
+
+        从已存储的最后一根K线开始获取（包含该K线，以便修正未收盘的数据），
+        未传入 last_timestamp 或数据早于窗口起点时，获取完整窗口。
+        """
         try:
-            today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
-            yesterday = today - timedelta(days=1)
-            start_date = yesterday - timedelta(days=self.price_range_days-1)  # 减1是因为包含昨天
+            start_timestamp, end_timestamp = self._get_candle_window(interval)
+            if last_timestamp is not None:
+                start_timestamp = max(start_timestamp, last_timestamp)
             
-            end_timestamp = int(today.timestamp())
-            start_timestamp = int(start_date.timestamp())
+            logger.debug(f"获取 {symbol} K线数据: "
+                         f"{datetime.fromtimestamp(start_timestamp).date()} 起")
             
-            logger.debug(f"获取 {symbol} K线数据: {start_date.date()} 到 {yesterday.date()}")
-            
-            candles = self.data_manager.get_futures_candlesticks(
+            return self.data_manager.get_futures_candlesticks(
                 symbol=symbol,
                 from_time=start_timestamp,
                 to_time=end_timestamp,
-                interval='1d'
+                interval=interval
+            )
+            
+        except Exception as e:
+            logger.error(f"获取{symbol}的K线数据失败: {str(e)}")
+            return None
+
+    def get_ohlcv_data(self, symbol: str) -> Optional[List]:
+        """从本地K线存储读取指定合约的收盘价"""
+        try:
+            _, end_timestamp = self._get_candle_window()
+            candles = self.candle_store.load_candles(
+                symbol, '1d', end_timestamp, self.price_range_days
             )
             
             if not candles:
@@ -123,16 +217,16 @@ class PriceUpdater:
                 return None
             
             # 提取收盘价，确保正好取N天的数据
-            close_prices = [float(candle['close']) for candle in candles[-self.price_range_days:]]
+            close_prices = [float(candle.close) for candle in candles]
             
             if len(close_prices) < self.price_range_days:
-                logger.warning(f"{symbol} 的K线数据��足{self.price_range_days}天: {len(close_prices)}天")
+                logger.warning(f"{symbol} 的K线数据不足{self.price_range_days}天: {len(close_prices)}天")
                 return None
             
             # 记录最高最低价格的日期
-            prices_with_dates = [(float(candle['close']), 
-                                datetime.fromtimestamp(candle['timestamp']).date()) 
-                               for candle in candles[-self.price_range_days:]]
+            prices_with_dates = [(float(candle.close), 
+                                datetime.fromtimestamp(candle.timestamp).date()) 
+                               for candle in candles]
             max_price, max_date = max(prices_with_dates, key=lambda x: x[0])
             min_price, min_date = min(prices_with_dates, key=lambda x: x[0])
             logger.debug(f"{symbol} {self.price_range_days}日最高收盘价 {max_price} ({max_date})")
@@ -141,17 +235,93 @@ class PriceUpdater:
             return close_prices
             
         except Exception as e:
-            logger.error(f"获取{symbol}的K线数据失败: {str(e)}")
+            logger.error(f"读取{symbol}的K线数据失败: {str(e)}")
             return None
 
-    def calculate_price_range(self, close_prices: List[float]) -> Optional[Dict]:
-        """计算20日价格范围"""
-        if not close_prices or len(close_prices) < 20:
+    def get_resume_timestamps(self, interval: str = '1d') -> Dict[str, int]:
+        """获取可以增量获取K线的品种及其已存储的最新K线时间戳
+
+        从窗口起点到已存储的最新K线之间缺少K线的品种（例如调大了窗口配置，较早的K线从未获取）
+        不在结果中，fetch_candles 会为这些品种回补完整窗口。
+        """
+        start_timestamp, _ = self._get_candle_window(interval)
+        seconds = INTERVAL_SECONDS[interval]
+        coverage = self.candle_store.get_window_coverage(interval, start_timestamp)
+        return {
+            symbol: last_timestamp
+            for symbol, (last_timestamp, count) in coverage.items()
+            if count >= (last_timestamp - start_timestamp) // seconds + 1
+        }
+
+    def fetch_ohlcv_batch(self, symbols: List[str], last_timestamps: Optional[Dict[str, int]] = None,
+                          interval: str = '1d'):
+        """并发获取多个合约的增量K线数据
+
+        使用有界线程池并发请求，限频由 DataManager 的进程级限流器负责。
+        按完成顺序逐个产出结果，数据库写入由调用方在主线程完成。
+
+        Args:
+            symbols: 合约列表
+            last_timestamps: 各合约本地已存储的最新K线时间戳
+            interval: K线周期
+
+        Yields:
+            (symbol, candles) 元组，获取失败时 candles 为 None
+        """
+        if not symbols:
+            return
+        last_timestamps = last_timestamps or {}
+
+        workers = max(1, min(self.fetch_workers, len(symbols)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ohlcv') as executor:
+            futures = {
+                executor.submit(self.fetch_candles, symbol, last_timestamps.get(symbol), interval): symbol
+                for symbol in symbols
+            }
+            for future in as_completed(futures):
+                symbol = futures[future]
+                try:
+                    candles = future.result()
+                except Exception as e:
+                    logger.error(f"获取{symbol}的K线数据失败: {str(e)}")
+                    candles = None
+                yield symbol, candles
+
+    def update_extrema(self, symbol: str, extrema: Optional[RollingExtrema] = None) -> Optional[RollingExtrema]:
+        """将本地K线存储中的新K线推入滚动极值状态
+
+        已有状态时只读取最后一根K线（含，用于修正）之后的K线；
+        没有状态时用本地存储中最近的K线初始化。
+        """
+        _, end_timestamp = self._get_candle_window()
+        if extrema is None:
+            extrema = RollingExtrema(self.state_days)
+        candles = self.candle_store.load_candles(
+            symbol, '1d', end_timestamp, self.state_days,
+            start_timestamp=extrema.last_timestamp
+        )
+        for candle in candles:
+            extrema.push(int(candle.timestamp), float(candle.close))
+        return extrema if extrema.count else None
+
+    def calculate_price_range(self, close_prices, window: Optional[int] = None) -> Optional[Dict]:
+        """计算N日价格范围
+
+        Args:
+            close_prices: RollingExtrema 实例或按时间排序的收盘价列表
+            window: 窗口天数，默认为 price_range_days
+        """
+        window = window or self.price_range_days
+        if not close_prices:
+            return None
+        if not isinstance(close_prices, RollingExtrema):
+            close_prices = RollingExtrema.from_closes(close_prices, max(window, len(close_prices)))
+        if close_prices.count < window:
             return None
 
-        high_price = max(close_prices)
-        low_price = min(close_prices)
-        last_price = close_prices[-1]
+        _, high_price = close_prices.high(window)
+        _, low_price = close_prices.low(window)
+        last_price = close_prices.last_close
 
         # 计算振幅和位置比例
         amplitude = (high_price - low_price) / low_price if low_price > 0 else 0
@@ -165,6 +335,146 @@ class PriceUpdater:
             'position_ratio': position_ratio
         }
 
+    def calculate_window_ranges(self, extrema: RollingExtrema) -> Dict[int, Dict]:
+        """由同一个滚动极值状态一次计算所有配置窗口的价格范围
+
+        Returns:
+            窗口天数到价格范围数据的映射，K线不足的窗口不在结果中
+        """
+        window_ranges = {}
+        for window in self.range_windows:
+            price_data = self.calculate_price_range(extrema, window)
+            if price_data:
+                window_ranges[window] = price_data
+        return window_ranges
+
+    def calculate_price_ranges(self, close_series: Dict[str, List[float]],
+                               window: Optional[int] = None) -> Dict[str, Dict]:
+        """批量计算所有品种的价格范围（NumPy 向量化）
+
+        Args:
+            close_series: 品种到按时间排序的收盘价列表的映射
+            window: 窗口天数，默认为 price_range_days
+
+        Returns:
+            品种到价格范围数据的映射，K线不足窗口天数的品种不在结果中
+        """
+        symbols, closes, mask = build_close_matrix(close_series, window or self.price_range_days)
+        ranges = compute_price_ranges(closes, mask)
+        return {
+            symbol: {field: float(values[row]) for field, values in ranges.items()}
+            for row, symbol in enumerate(symbols)
+            if mask[row]
+        }
+
+    def save_price_range(self, symbol: str, price_data: Dict,
+                         existing_record: Optional[PriceRange20d], update_date: date) -> PriceRange20d:
+        """将价格范围写入 price_range_20d 会话（由调用方提交事务）"""
+        if existing_record:
+            # 更新现有记录
+            existing_record.high_price_20d = price_data['high_price_20d']
+            existing_record.low_price_20d = price_data['low_price_20d']
+            existing_record.last_price = price_data['last_price']
+            existing_record.amplitude = price_data['amplitude']
+            existing_record.position_ratio = price_data['position_ratio']
+            existing_record.volume_24h = 0  # 初始化为0，等待tick更新
+            existing_record.update_date = update_date
+            logger.info(f"更新合约 {symbol} 的价格范围数据")
+            return existing_record
+
+        # 创建新记录
+        new_record = PriceRange20d(
+            symbol=symbol,
+            high_price_20d=price_data['high_price_20d'],
+            low_price_20d=price_data['low_price_20d'],
+            last_price=price_data['last_price'],
+            amplitude=price_data['amplitude'],
+            position_ratio=price_data['position_ratio'],
+            volume_24h=0,  # 初始化为0，等待tick更新
+            update_date=update_date
+        )
+        db.session.add(new_record)
+        logger.info(f"添加新合约 {symbol} 的价格范围数据")
+        return new_record
+
+    def save_window_ranges(self, symbol: str, interval: str,
+                           window_ranges: Dict[int, Dict], update_date: date):
+        """将各窗口的价格范围写入 price_range_window 会话（由调用方提交事务）"""
+        self._upsert_window_rows(self._window_rows(symbol, interval, window_ranges, update_date))
+
+    @staticmethod
+    def _window_rows(symbol: str, interval: str, window_ranges: Dict[int, Dict], update_date: date) -> List[Dict]:
+        """将各窗口的价格范围转换为 price_range_window 的行"""
+        return [
+            {
+                'symbol': symbol,
+                'interval': interval,
+                'window_days': window,
+                'high_price': price_data['high_price_20d'],
+                'low_price': price_data['low_price_20d'],
+                'last_price': price_data['last_price'],
+                'amplitude': price_data['amplitude'],
+                'update_date': update_date,
+                'update_time': datetime.now()
+            }
+            for window, price_data in window_ranges.items()
+        ]
+
+    @staticmethod
+    def _upsert_window_rows(rows: List[Dict]):
+        """多行写入 price_range_window 会话（由调用方提交事务）"""
+        if not rows:
+            return
+        stmt = mysql_insert(PriceRangeWindow).values(rows)
+        stmt = stmt.on_duplicate_key_update(
+            high_price=stmt.inserted.high_price,
+            low_price=stmt.inserted.low_price,
+            last_price=stmt.inserted.last_price,
+            amplitude=stmt.inserted.amplitude,
+            update_date=stmt.inserted.update_date,
+            update_time=stmt.inserted.update_time
+        )
+        db.session.execute(stmt)
+
+    def rebuild_price_ranges(self):
+        """由本地K线存储批量重算所有品种的价格范围
+
+        不访问交易所，一次向量化计算后在同一事务中写入 price_range_20d，
+        适用于调整 PRICE_RANGE_DAYS 后或数据修复时的全量重算。
+        """
+        with self.app.app_context():
+            try:
+                logger.info("开始批量重算价格范围")
+                yesterday = date.today() - timedelta(days=1)
+                _, end_timestamp = self._get_candle_window()
+                
+                # 按最长窗口读取一次，各窗口取其尾部计算
+                close_series = self.candle_store.load_close_series('1d', end_timestamp, self.state_days)
+                window_results = {
+                    window: self.calculate_price_ranges(close_series, window)
+                    for window in self.range_windows
+                }
+                price_ranges = window_results[self.price_range_days]
+                logger.info(f"本地K线品种数: {len(close_series)}, 有效品种数: {len(price_ranges)}")
+                
+                existing_records = {record.symbol: record for record in PriceRange20d.query.all()}
+                for symbol, price_data in price_ranges.items():
+                    self.save_price_range(symbol, price_data, existing_records.get(symbol), yesterday)
+                for symbol in close_series:
+                    window_ranges = {
+                        window: results[symbol]
+                        for window, results in window_results.items()
+                        if symbol in results
+                    }
+                    self.save_window_ranges(symbol, '1d', window_ranges, yesterday)
+                db.session.commit()
+                logger.info(f"批量重算完成，写入 {len(price_ranges)} 个品种")
+                
+            except Exception as e:
+                logger.error(f"批量重算价格范围失败: {str(e)}")
+                db.session.rollback()
+                raise
+
     def update_price_range(self, symbol: str, price_data: Dict):
         """更新数据库中的价格范围数据"""
         today = datetime.now().date()
@@ -201,11 +511,61 @@ class PriceUpdater:
                 conn.commit()
                 return True
 
+    def load_checkpoint(self, run_date: date, interval: str = '1d') -> Dict[str, str]:
+        """读取指定运行日期已处理品种的进度，返回品种到状态的映射"""
+        rows = PriceRangeCheckpoint.query.filter_by(run_date=run_date, interval=interval).all()
+        return {row.symbol: row.status for row in rows}
+
+    def load_checkpoint_volumes(self, run_date: date, interval: str = '1d') -> Dict[str, float]:
+        """读取指定运行日期各品种在价格范围更新清零前的24小时成交量"""
+        rows = PriceRangeCheckpoint.query.filter(
+            PriceRangeCheckpoint.run_date == run_date,
+            PriceRangeCheckpoint.interval == interval,
+            PriceRangeCheckpoint.volume_24h.isnot(None)
+        ).all()
+        return {row.symbol: float(row.volume_24h) for row in rows}
+
+    def mark_checkpoint(self, run_date: date, symbol: str, status: str, interval: str = '1d',
+                        volume_24h: Optional[float] = None):
+        """记录品种进度（只写入会话，与该品种的数据在同一事务中提交）
+
+        Args:
+            volume_24h: 价格范围更新清零前的24小时成交量，进程中断后续跑时历史快照仍能取到
+        """
+        stmt = mysql_insert(PriceRangeCheckpoint).values(
+            run_date=run_date,
+            interval=interval,
+            symbol=symbol,
+            status=status,
+            volume_24h=volume_24h,
+            updated_at=datetime.now()
+        )
+        stmt = stmt.on_duplicate_key_update(
+            status=stmt.inserted.status,
+            volume_24h=stmt.inserted.volume_24h,
+            updated_at=stmt.inserted.updated_at
+        )
+        db.session.execute(stmt)
+
+    def purge_checkpoints(self, run_date: date):
+        """删除超过保留天数的进度记录"""
+        cutoff = run_date - timedelta(days=Config.PRICE_RANGE_CHECKPOINT_DAYS)
+        deleted = PriceRangeCheckpoint.query.filter(
+            PriceRangeCheckpoint.run_date < cutoff
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        if deleted:
+            logger.info(f"清理 {cutoff} 之前的进度记录 {deleted} 条")
+
     def run(self):
-        """运行更新程序"""
+        """运行更新程序
+
+        每个品种的处理结果与进度记录在同一事务中提交，进程中断后再次运行时
+        只处理当天尚未记录进度的品种。
+        """
         with self.app.app_context():
             try:
-                self.init_connections()
+                self.ensure_connections()
                 logger.info("开始价格范围更新")
                 
                 today = date.today()
@@ -224,11 +584,9 @@ class PriceUpdater:
                 
                 # 2. 获取��有可用合约
                 try:
-                    futures_api = self.data_manager.get_futures_api()
-                    available_contracts = futures_api.list_futures_contracts(settle='usdt')
+                    available_contracts = self.data_manager.get_contract_map()
                     valid_contracts = []
-                    for contract in available_contracts:
-                        symbol = contract.name.replace('_USDT', '')
+                    for symbol, contract in available_contracts.items():
                         valid_contracts.append({
                             'symbol': symbol,
                             'name': contract.name
@@ -238,89 +596,277 @@ class PriceUpdater:
                     logger.error(f"获取合约列表失败: {str(e)}")
                     raise
                 
-                # 3. 处理每个合约
+                # 3. 筛选需要更新的合约（跳过今天已处理的品种）
+                self.purge_checkpoints(today)
+                checkpoint = self.load_checkpoint(today)
+                if checkpoint:
+                    logger.info(f"断点续跑：今天已处理 {len(checkpoint)} 个合约")
+                pending_symbols = []
+                for contract in valid_contracts:
+                    symbol = contract['symbol']
+                    if symbol in checkpoint:
+                        continue
+                    existing_record = existing_records.get(symbol)
+                    if not existing_record:
+                        logger.info(f"发现新合约: {symbol}")
+                        pending_symbols.append(symbol)
+                    elif existing_record.update_date < yesterday:
+                        logger.info(f"合约 {symbol} 需要更新，最后更新日期: {existing_record.update_date}")
+                        pending_symbols.append(symbol)
+                logger.info(f"需要更新的合约数量: {len(pending_symbols)}")
+                
+                # 4. 并发获取增量K线，在主线程中写入本地存储并计算
+                last_timestamps = self.get_resume_timestamps('1d')
+                range_states = self.range_state_store.load_all('1d', self.state_days)
                 update_count = 0
                 new_count = 0
-                for contract in valid_contracts:
+                for symbol, candles in self.fetch_ohlcv_batch(pending_symbols, last_timestamps):
                     try:
-                        symbol = contract['symbol']
                         existing_record = existing_records.get(symbol)
                         
-                        # 检查是否需要更新
-                        need_update = False
-                        if not existing_record:
-                            logger.info(f"发现新合约: {symbol}")
-                            need_update = True
-                        elif existing_record.update_date < yesterday:
-                            logger.info(f"合约 {symbol} 需要更新，最后更新日期: {existing_record.update_date}")
-                            need_update = True
+                        if candles is None:
+                            # 获取失败：不写入结果和进度，留待下次运行重试
+                            logger.warning(f"获取 {symbol} 的K线失败，跳过")
+                            continue
                         
-                        if need_update:
-                            # 获取K线数据
-                            close_prices = self.get_ohlcv_data(symbol)
-                            if not close_prices:
-                                logger.warning(f"无法获取 {symbol} 的K线数据")
-                                continue
-                            
-                            if len(close_prices) < 20:
-                                logger.warning(f"{symbol} 的K线数据不足20天: {len(close_prices)}天")
-                                continue
-                            
-                            # 计算价格范围
-                            price_data = self.calculate_price_range(close_prices)
-                            if not price_data:
-                                logger.warning(f"无法计算 {symbol} 的价格范围")
-                                continue
-                            
-                            try:
+                        if candles:
+                            self.candle_store.append(symbol, '1d', candles)
+                            # 将新K线推入滚动极值状态；回补了完整窗口的品种由本地存储重建状态
+                            state = range_states.get(symbol) if symbol in last_timestamps else None
+                            extrema = self.update_extrema(symbol, state)
+                        else:
+                            # 增量获取包含已存储的最后一根K线，返回空列表说明交易所在窗口内确实没有K线
+                            extrema = None
+                        if not extrema:
+                            logger.warning(f"{symbol} 在窗口内没有K线数据")
+                            self.mark_checkpoint(today, symbol, 'no_data')
+                            db.session.commit()
+                            continue
+                        
+                        # 由同一份K线计算所有窗口的价格范围
+                        window_ranges = self.calculate_window_ranges(extrema)
+                        price_data = window_ranges.get(self.price_range_days)
+                        
+                        try:
+                            # 价格范围更新会清零 volume_24h，清零前的成交量随进度一起提交，供历史快照使用
+                            volume_24h = None
+                            if price_data:
+                                if existing_record and existing_record.volume_24h:
+                                    volume_24h = float(existing_record.volume_24h)
+                                self.save_price_range(symbol, price_data, existing_record, yesterday)
                                 if existing_record:
-                                    # 更新现有记录
-                                    existing_record.high_price_20d = price_data['high_price_20d']
-                                    existing_record.low_price_20d = price_data['low_price_20d']
-                                    existing_record.last_price = price_data['last_price']
-                                    existing_record.amplitude = price_data['amplitude']
-                                    existing_record.position_ratio = price_data['position_ratio']
-                                    existing_record.volume_24h = 0  # 初始化为0，等待tick更新
-                                    existing_record.update_date = yesterday
                                     update_count += 1
-                                    logger.info(f"更新合约 {symbol} 的价格范围数据")
                                 else:
-                                    # 创建新记录
-                                    new_record = PriceRange20d(
-                                        symbol=symbol,
-                                        high_price_20d=price_data['high_price_20d'],
-                                        low_price_20d=price_data['low_price_20d'],
-                                        last_price=price_data['last_price'],
-                                        amplitude=price_data['amplitude'],
-                                        position_ratio=price_data['position_ratio'],
-                                        volume_24h=0,  # 初始化为0，等待tick更新
-                                        update_date=yesterday
-                                    )
-                                    db.session.add(new_record)
                                     new_count += 1
-                                    logger.info(f"添加新合约 {symbol} 的价格范围数据")
-                                
-                                db.session.commit()
-                                
-                            except Exception as e:
-                                logger.error(f"保存 {symbol} 数据失败: {str(e)}")
-                                db.session.rollback()
-                                continue
+                            else:
+                                logger.warning(f"{symbol} 的K线数据不足{self.price_range_days}天: {extrema.count}天")
+                            
+                            self.save_window_ranges(symbol, '1d', window_ranges, yesterday)
+                            self.range_state_store.save(symbol, '1d', extrema)
+                            self.mark_checkpoint(today, symbol, 'done' if price_data else 'insufficient',
+                                                 volume_24h=volume_24h)
+                            db.session.commit()
                             
-                            time.sleep(0.5)  # 避免请求过于频繁
+                        except Exception as e:
+                            logger.error(f"保存 {symbol} 数据失败: {str(e)}")
+                            db.session.rollback()
+                            continue
                             
                     except Exception as e:
                         logger.error(f"处理合约 {symbol} 时发生错误: {str(e)}")
+                        db.session.rollback()
                         continue
                 
                 logger.info(f"价格范围数据更新完成")
                 logger.info(f"更新现有记录: {update_count} 个")
                 logger.info(f"新增记录: {new_count} 个")
                 
+                # 5. 写入当天的历史快照（成交量取自当天所有进度记录，包括中断前已处理的品种）
+                self.snapshot_history(yesterday, self.load_checkpoint_volumes(today))
+                
             except Exception as e:
                 logger.error(f"更新过程发生错误: {str(e)}")
                 raise
 
+    def snapshot_history(self, update_date: date, volumes: Optional[Dict[str, float]] = None):
+        """将当天的价格范围批量写入 price_range_history（可重复执行）
+
+        Args:
+            volumes: 品种到清零前 24 小时成交量的映射
+        """
+        try:
+            count = self.history_store.snapshot(update_date, volumes)
+            logger.info(f"写入 {update_date} 历史快照 {count} 个品种")
+        except Exception as e:
+            # 快照失败不影响当天的价格范围，下次运行会覆盖写入
+            logger.error(f"写入历史快照失败: {str(e)}")
+
+    def compact_history(self):
+        """删除超过 PRICE_RANGE_HISTORY_DAYS 的历史分区"""
+        with self.app.app_context():
+            self.ensure_connections()
+            dropped = self.history_store.purge(Config.PRICE_RANGE_HISTORY_DAYS)
+            logger.info(f"历史快照清理完成，删除分区 {len(dropped)} 个")
+
+    def run_interval(self, interval: str) -> Dict:
+        """运行一个日内周期的价格范围流水线
+
+        增量获取各品种最后一根已收盘K线之前缺失的K线，然后从本地存储一次读取最长窗口的收盘价，
+        向量化计算该周期所有窗口的价格范围并在一个事务中写入 price_range_window。
+        品种范围与实时行情一致（price_range_20d 最新日期的品种）。
+
+        Returns:
+            本次运行状态：K线截止时间、滞后秒数、是否满足SLA、未取到最新K线的品种数等
+        """
+        pipeline = Config.INTRADAY_RANGE_PIPELINES[interval]
+        windows = sorted(pipeline['windows'])
+        seconds = INTERVAL_SECONDS[interval]
+        
+        with self.app.app_context():
+            try:
+                self.ensure_connections()
+                started = time.perf_counter()
+                _, end_timestamp = self._get_candle_window(interval)
+                symbols = [record.symbol for record in self._load_tick_records()]
+                
+                # 1. 增量获取K线
+                last_timestamps = self.get_resume_timestamps(interval)
+                pending_symbols = [symbol for symbol in symbols if last_timestamps.get(symbol, 0) < end_timestamp]
+                logger.info(f"[{interval}] 品种数: {len(symbols)}, 需要获取K线: {len(pending_symbols)}")
+                for symbol, candles in self.fetch_ohlcv_batch(pending_symbols, last_timestamps, interval):
+                    if not candles:
+                        continue
+                    try:
+                        self.candle_store.append(symbol, interval, candles)
+                    except Exception as e:
+                        logger.error(f"[{interval}] 保存 {symbol} K线失败: {str(e)}")
+                
+                # 2. 批量计算所有窗口并写入
+                close_series = self.candle_store.load_close_series(interval, end_timestamp, windows[-1])
+                window_results = {
+                    window: self.calculate_price_ranges(close_series, window)
+                    for window in windows
+                }
+                rows = []
+                for symbol in close_series:
+                    window_ranges = {
+                        window: results[symbol]
+                        for window, results in window_results.items()
+                        if symbol in results
+                    }
+                    rows.extend(self._window_rows(symbol, interval, window_ranges, date.today()))
+                self._upsert_window_rows(rows)
+                db.session.commit()
+                
+                # 3. 检查新鲜度
+                latest_timestamps = self.candle_store.get_last_timestamps(interval)
+                stale = [symbol for symbol in symbols if latest_timestamps.get(symbol, 0) < end_timestamp]
+                lag_seconds = time.time() - (end_timestamp + seconds)
+                status = {
+                    'interval': interval,
+                    'end_timestamp': end_timestamp,
+                    'symbols': len(close_series),
+                    'rows': len(rows),
+                    'stale': len(stale),
+                    'lag_seconds': lag_seconds,
+                    'elapsed': time.perf_counter() - started,
+                    'within_sla': lag_seconds <= pipeline['sla_minutes'] * 60,
+                    'finished_at': datetime.now(),
+                }
+                self.pipeline_status[interval] = status
+                
+                logger.info(f"[{interval}] 写入 {len(rows)} 条窗口数据，品种 {len(close_series)} 个，"
+                            f"耗时 {status['elapsed']:.2f}s，K线收盘后 {lag_seconds / 60:.1f} 分钟完成")
+                if stale:
+                    logger.warning(f"[{interval}] {len(stale)} 个品种未取到最新K线: {', '.join(stale[:10])}")
+                if not status['within_sla']:
+                    logger.warning(f"[{interval}] 超出新鲜度SLA（{pipeline['sla_minutes']} 分钟）")
+                return status
+                
+            except Exception as e:
+                logger.error(f"[{interval}] 日内价格范围更新失败: {str(e)}")
+                db.session.rollback()
+                raise
+
+    def _load_tick_records(self) -> List[PriceRange20d]:
+        """获取最新日期的所有品种记录"""
+        latest_date = db.session.query(db.func.max(PriceRange20d.update_date)).scalar()
+        logger.info(f"最新数据日期: {latest_date}")
+        
+        if not latest_date:
+            logger.warning("未找到任何价格范围数据")
+            return []
+        
+        # 获取需要更新的品种列表
+        symbols = PriceRange20d.query.filter_by(update_date=latest_date).all()
+        if not symbols:
+            logger.warning("没有找到需要更新的品种")
+            return []
+        
+        logger.info(f"需要更新的品种数量: {len(symbols)}")
+        return symbols
+
+    def write_ticks(self, symbols: List[PriceRange20d], ticker_dict: Dict):
+        """按最新行情计算振幅和位置比，并批量写入有变化的品种
+
+        Args:
+            symbols: 最新日期的价格范围记录
+            ticker_dict: 品种到行情的映射，行情对象需提供 last 和 volume_24h_settle 属性
+        """
+        # 获取当前时间
+        current_time = datetime.now()
+        
+        # 一次向量化计算所有有行情品种的振幅和位置比
+        matched = [symbol for symbol in symbols if symbol.symbol in ticker_dict]
+        high_prices = np.array([float(symbol.high_price_20d) for symbol in matched], dtype=np.float64)
+        low_prices = np.array([float(symbol.low_price_20d) for symbol in matched], dtype=np.float64)
+        last_prices = np.array([float(ticker_dict[symbol.symbol].last) for symbol in matched], dtype=np.float64)
+        amplitudes, position_ratios = compute_tick_metrics(high_prices, low_prices, last_prices)
+        
+        # 组装每个品种的写入数据
+        rows = []
+        for index, symbol in enumerate(matched):
+            self.tick_tracker.seed(symbol)
+            ticker = ticker_dict[symbol.symbol]
+            last_price = Decimal(str(ticker.last))
+            old_price = symbol.last_price
+            
+            # 获取24小时成交量（USDT计价）
+            volume_24h = Decimal(str(ticker.volume_24h_settle or 0))
+            
+            rows.append({
+                'id': symbol.id,
+                'symbol': symbol.symbol,
+                'high_price_20d': symbol.high_price_20d,
+                'low_price_20d': symbol.low_price_20d,
+                'last_price': last_price,
+                'amplitude': float(amplitudes[index]),
+                'position_ratio': float(position_ratios[index]),
+                'volume_24h': float(volume_24h),  # 更新24小时成交量
+                'update_date': symbol.update_date,
+                'update_time': current_time
+            })
+            
+            # 记录价格和成交量变化
+            if old_price != last_price:
+                logger.debug(f"{symbol.symbol} 更新 - "
+                           f"价格: {old_price} -> {last_price}, "
+                           f"24h成交量: {volume_24h:,.0f} USDT")
+        
+        # 只写入有变化或到达心跳时间的行
+        dirty_rows = self.tick_tracker.select(rows, current_time)
+        
+        # 结束读事务，再由批量写入器在单独的事务中一次写入
+        db.session.commit()
+        metrics = self.tick_writer.write(dirty_rows)
+        self.tick_tracker.mark_persisted(dirty_rows)
+        self.last_write_metrics = metrics
+        logger.info(f"实时行情更新完成，有行情品种 {len(rows)} 个, "
+                    f"写入 {metrics['rows']} 个品种, "
+                    f"影响行数: {metrics['affected']}, "
+                    f"写入耗时: {metrics['elapsed'] * 1000:.1f} ms")
+        return metrics
+
     def update_ticks(self):
         """更新实时行情数据"""
         with self.app.app_context():
@@ -328,74 +874,58 @@ class PriceUpdater:
                 logger.info("开始更新实时行情数据")
                 
                 # 初始化连接（如果需要）
-                if not self.data_manager:
-                    self.init_connections()
-                
-                # 获取最新日期的所有品种
-                latest_date = db.session.query(db.func.max(PriceRange20d.update_date)).scalar()
-                logger.info(f"最新数据日期: {latest_date}")
+                self.ensure_connections()
                 
-                if not latest_date:
-                    logger.warning("未找到任何价格范围数据")
-                    return
-                
-                # 获取需要更新的品种列表
-                symbols = PriceRange20d.query.filter_by(update_date=latest_date).all()
+                symbols = self._load_tick_records()
                 if not symbols:
-                    logger.warning("没有找到需要更新的品种")
                     return
                 
-                # 获取所有品种的符号列表
-                symbol_list = [symbol.symbol for symbol in symbols]
-                logger.info(f"需要更新的品种数量: {len(symbol_list)}")
-                
                 # 使用新的 get_ticks 方法获取行情数据
-                ticker_dict = self.data_manager.get_ticks(symbol_list)
+                ticker_dict = self.data_manager.get_ticks([symbol.symbol for symbol in symbols])
                 logger.info(f"获取到的行情数据数量: {len(ticker_dict)}")
                 
-                # 获取当前时间
-                current_time = datetime.now()
+                self.write_ticks(symbols, ticker_dict)
                 
-                # 更新每个品种的数据
-                update_count = 0
-                for symbol in symbols:
-                    if symbol.symbol in ticker_dict:
-                        ticker = ticker_dict[symbol.symbol]
-                        last_price = Decimal(str(ticker.last))
-                        old_price = symbol.last_price
-                        
-                        # 获取24小时成交量（USDT计价）
-                        volume_24h = Decimal(str(ticker.volume_24h_settle or 0))
-                        
-                        # 计算新的振幅和位置比
-                        high_price = Decimal(str(symbol.high_price_20d))
-                        low_price = Decimal(str(symbol.low_price_20d))
-                        new_amplitude = (high_price - low_price) / low_price if low_price > 0 else 0
-                        new_position_ratio = (last_price - low_price) / (high_price - low_price) if (high_price - low_price) > 0 else 0
-                        
-                        # 更新数据
-                        symbol.last_price = last_price
-                        symbol.amplitude = float(new_amplitude)
-                        symbol.position_ratio = float(new_position_ratio)
-                        symbol.volume_24h = float(volume_24h)  # 更新24小时成交量
-                        symbol.update_time = current_time
-                        update_count += 1
-                        
-                        # 记录价格和成交量变化
-                        if old_price != last_price:
-                            logger.info(f"{symbol.symbol} 更新 - "
-                                      f"价格: {old_price} -> {last_price}, "
-                                      f"24h成交量: {volume_24h:,.0f} USDT")
+            except Exception as e:
+                logger.error(f"实时行情更新失败: {str(e)}")
+                db.session.rollback()
+                raise
+
+    def flush_ticker_board(self, board):
+        """将推送行情看板的最新数据写入 price_range_20d
+
+        只使用接收时间不超过 TICKER_STREAM_MAX_AGE 的行情，过期的品种既不写入也不刷新 update_time；
+        缺少新鲜行情的品种（推送中断或长时间无推送）按 TICKER_STREAM_FALLBACK_INTERVAL 改用 REST 行情。
+        """
+        with self.app.app_context():
+            try:
+                self.ensure_connections()
                 
-                # 提交更改
-                db.session.commit()
-                logger.info(f"实时行情更新完成，成功更新了 {update_count} 个品种")
+                symbols = self._load_tick_records()
+                if not symbols:
+                    return
+                
+                ticker_dict = board.snapshot(Config.TICKER_STREAM_MAX_AGE)
+                logger.info(f"行情看板新鲜品种数量: {len(ticker_dict)}/{len(board)}")
+                
+                missing = [symbol.symbol for symbol in symbols if symbol.symbol not in ticker_dict]
+                if missing and time.monotonic() - self._stream_fallback_at >= Config.TICKER_STREAM_FALLBACK_INTERVAL:
+                    self._stream_fallback_at = time.monotonic()
+                    logger.warning(f"{len(missing)} 个品种没有新鲜的推送行情，改用 REST 行情")
+                    ticker_dict.update(self.data_manager.get_ticks(missing))
+                
+                self.write_ticks(symbols, ticker_dict)
                 
             except Exception as e:
-                logger.error(f"实时行情更新失败: {str(e)}")
+                logger.error(f"推送行情写入失败: {str(e)}")
                 db.session.rollback()
                 raise
 
+    def get_stream_symbols(self) -> List[str]:
+        """获取推送行情需要订阅的品种"""
+        with self.app.app_context():
+            return [symbol.symbol for symbol in self._load_tick_records()]
+
     def _update_price_ranges(self):
         """更新20日价格范围数据"""
         # 获取所有品种的20日高点
@@ -432,34 +962,98 @@ class PriceUpdater:
             logger.error(f"保存价格范围数据失败: {str(e)}")
             raise
 
-def run_scheduler():
-    """行调度器"""
-    logger.info("启动价格更新调度器")
+def create_ticker_feed(contracts_provider):
+    """按配置创建推送行情源：配置了回放文件时回放录制行情，否则连接 WebSocket"""
+    from app.ticker_stream import GateWebSocketTickerFeed, JsonLinesTickerFeed
     
+    if Config.TICKER_STREAM_REPLAY_FILE:
+        return JsonLinesTickerFeed(Config.TICKER_STREAM_REPLAY_FILE)
+    return GateWebSocketTickerFeed(Config.TICKER_STREAM_URL, contracts_provider)
+
+def run_scheduler(stream: bool = False, feed=None):
+    """行调度器
+    
+    Args:
+        stream: 是否使用推送行情代替每分钟轮询
+        feed: 自定义推送行情源（TickerFeed），默认按配置创建
+    """
+    logger.info(f"启动价格更新调度器{'（推送行情模式）' if stream else ''}")
+    
+    # 常驻的更新器：应用、DataManager 和连接只创建一次，在任务间复用
+    updater = None
+
+    def get_updater() -> PriceUpdater:
+        nonlocal updater
+        if updater is None:
+            updater = PriceUpdater()
+        return updater
+
     # 更新任务
     def price_range_job():
         try:
             logger.info(f"开始执行价格范围更新任务 - {datetime.now()}")
-            updater = PriceUpdater()
-            updater.run()
+            get_updater().run()
             logger.info("价格范围更新任务成功")
         except Exception as e:
             logger.error(f"价格范围更新任务失败: {str(e)}")
+            if updater:
+                updater.reset()
 
     def tick_update_job():
         try:
             logger.info(f"开始执行实时行情更新任务 - {datetime.now()}")
-            updater = PriceUpdater()
-            updater.update_ticks()
+            get_updater().update_ticks()
             logger.info("实时行情更新任务完成")
         except Exception as e:
             logger.error(f"实时行情更新任务失败: {str(e)}")
+            if updater:
+                updater.reset()
+
+    def history_compaction_job():
+        try:
+            get_updater().compact_history()
+        except Exception as e:
+            logger.error(f"历史快照清理任务失败: {str(e)}")
+            if updater:
+                updater.reset()
+
+    def interval_job(interval: str):
+        try:
+            get_updater().run_interval(interval)
+        except Exception as e:
+            logger.error(f"[{interval}] 日内价格范围任务失败: {str(e)}")
+            if updater:
+                updater.reset()
 
     # 设置每天 0:01 执行价格范围更新
     schedule.every().day.at("00:01").do(price_range_job)
+    # 日内周期的价格范围各自按刷新间隔独立运行
+    for interval, pipeline in Config.INTRADAY_RANGE_PIPELINES.items():
+        schedule.every(pipeline['refresh_minutes']).minutes.do(interval_job, interval)
+    # 每天 0:30 清理过期的历史快照分区
+    schedule.every().day.at("00:30").do(history_compaction_job)
     
-    # 设置每分钟执行实时行情更新
-    schedule.every(1).minutes.do(tick_update_job)
+    if stream:
+        # 推送行情持续更新内存看板，按配置的节奏写入数据库
+        from app.ticker_stream import TickerStreamer
+        
+        stream_updater = get_updater()
+        streamer = TickerStreamer(feed or create_ticker_feed(stream_updater.get_stream_symbols)).start()
+        
+        def stream_flush_job():
+            try:
+                if not streamer.is_alive():
+                    logger.warning("推送行情消费线程已结束，本次写入使用 REST 行情")
+                get_updater().flush_ticker_board(streamer.board)
+            except Exception as e:
+                logger.error(f"推送行情写入任务失败: {str(e)}")
+                if updater:
+                    updater.reset()
+        
+        schedule.every(Config.TICKER_FLUSH_INTERVAL).seconds.do(stream_flush_job)
+    else:
+        # 设置每分钟执行实时行情更新
+        schedule.every(1).minutes.do(tick_update_job)
     
     # 启动时先执行一次价格范围更新
 
@@ -489,6 +1083,21 @@ if __name__ == "__main__":
                 # 单次运行实时行情更新
                 updater = PriceUpdater()
                 updater.update_ticks()
+            elif sys.argv[1] == '--rebuild':
+                # 由本地K线批量重算价格范围
+                updater = PriceUpdater()
+                updater.rebuild_price_ranges()
+            elif sys.argv[1] == '--compact-history':
+                # 清理过期的历史快照分区
+                updater = PriceUpdater()
+                updater.compact_history()
+            elif sys.argv[1] == '--interval':
+                # 单次运行日内周期的价格范围更新，如 --interval 1h
+                updater = PriceUpdater()
+                updater.run_interval(sys.argv[2])
+            elif sys.argv[1] == '--stream':
+                # 推送行情模式的调度器
+                run_scheduler(stream=True)
         else:
             # 调度器模式
             run_scheduler()
@@ -0,0 +1,173 @@
+import os
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from app import setup_logging
+from app.database import DatabaseConnection
+
+logger = setup_logging(
+    'range_history',
+    os.path.join('logs', 'range_history.log')
+)
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _next_month(day: date) -> date:
+    return (day.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+
+class PriceRangeHistoryStore:
+    """price_range_history 每日快照表
+
+    表按 update_date 每月一个 RANGE 分区，主键为 (update_date, symbol)。
+    快照通过一条 INSERT ... SELECT 从 price_range_20d 写入，
+    过期数据按分区整体删除，不需要逐行 DELETE。
+    """
+
+    TABLE = 'price_range_history'
+    COLUMNS = (
+        'symbol', 'high_price_20d', 'low_price_20d', 'last_price',
+        'amplitude', 'position_ratio', 'volume_24h'
+    )
+
+    def __init__(self, db_connection: DatabaseConnection):
+        self.db_connection = db_connection
+
+    @staticmethod
+    def partition_name(month: date) -> str:
+        return f"p{month:%Y%m}"
+
+    def _partition_clause(self, month: date) -> str:
+        return (f"PARTITION {self.partition_name(month)} "
+                f"VALUES LESS THAN (TO_DAYS('{_next_month(month):%Y-%m-%d}'))")
+
+    def ensure_table(self, day: date):
+        """表不存在时创建，初始分区为 day 所在月份"""
+        with self.db_connection.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(f"""
+                    CREATE TABLE IF NOT EXISTS {self.TABLE} (
+                        update_date DATE NOT NULL,
+                        symbol VARCHAR(20) NOT NULL,
+                        high_price_20d DECIMAL(20, 8) NOT NULL,
+                        low_price_20d DECIMAL(20, 8) NOT NULL,
+                        last_price DECIMAL(20, 8) NOT NULL,
+                        amplitude DECIMAL(20, 8) NOT NULL,
+                        position_ratio DECIMAL(20, 8) NOT NULL,
+                        volume_24h DECIMAL(20, 8) DEFAULT 0,
+                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        PRIMARY KEY (update_date, symbol),
+                        KEY idx_history_symbol_date (symbol, update_date)
+                    )
+                    PARTITION BY RANGE (TO_DAYS(update_date)) (
+                        {self._partition_clause(_month_start(day))}
+                    )
+                """)
+
+    def get_partitions(self) -> List[date]:
+        """返回已有分区对应的月份（升序）"""
+        with self.db_connection.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute("""
+                    SELECT PARTITION_NAME AS name
+                    FROM information_schema.PARTITIONS
+                    WHERE TABLE_SCHEMA = DATABASE()
+                      AND TABLE_NAME = %s
+                      AND PARTITION_NAME IS NOT NULL
+                """, (self.TABLE,))
+                names = [row['name'] for row in cursor.fetchall()]
+        return sorted(date(int(name[1:5]), int(name[5:7]), 1) for name in names)
+
+    def ensure_partitions(self, day: date, months_ahead: int = 1):
+        """确保 day 所在月份及之后 months_ahead 个月的分区存在
+
+        RANGE 分区只能在末尾追加，因此只添加晚于现有最后一个分区的月份。
+        """
+        self.ensure_table(day)
+        months = self.get_partitions()
+        last_month = months[-1] if months else None
+        if months and _month_start(day) < months[0]:
+            logger.warning(f"{day} 早于最早的分区 {self.partition_name(months[0])}，无法写入")
+
+        month = _month_start(day)
+        new_partitions = []
+        for _ in range(months_ahead + 1):
+            if last_month is None or month > last_month:
+                new_partitions.append(month)
+            month = _next_month(month)
+
+        if not new_partitions:
+            return
+        clauses = ', '.join(self._partition_clause(month) for month in new_partitions)
+        with self.db_connection.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(f"ALTER TABLE {self.TABLE} ADD PARTITION ({clauses})")
+        logger.info(f"新增分区: {', '.join(self.partition_name(month) for month in new_partitions)}")
+
+    def snapshot(self, update_date: date, volumes: Optional[Dict[str, float]] = None) -> int:
+        """将 price_range_20d 中指定日期的记录写入快照表（重复执行会覆盖当天快照的价格字段）
+
+        price_range_20d 更新价格范围时会把 volume_24h 清零等待行情刷新，因此成交量以
+        volumes 中清零前的值为准；已存在的快照行不会被覆盖成交量。
+
+        Args:
+            update_date: 快照日期
+            volumes: 品种到清零前 24 小时成交量的映射
+
+        Returns:
+            写入的品种数
+        """
+        self.ensure_partitions(update_date)
+        columns = ', '.join(self.COLUMNS)
+        updates = ', '.join(f"{column} = VALUES({column})" for column in self.COLUMNS
+                            if column not in ('symbol', 'volume_24h'))
+        with self.db_connection.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(f"""
+                    INSERT INTO {self.TABLE} (update_date, {columns})
+                    SELECT update_date, {columns}
+                    FROM price_range_20d
+                    WHERE update_date = %s
+                    ON DUPLICATE KEY UPDATE {updates}
+                """, (update_date,))
+                if volumes:
+                    cursor.executemany(
+                        f"UPDATE {self.TABLE} SET volume_24h = %s WHERE update_date = %s AND symbol = %s",
+                        [(volume, update_date, symbol) for symbol, volume in volumes.items()]
+                    )
+                cursor.execute(f"SELECT COUNT(*) AS total FROM {self.TABLE} WHERE update_date = %s",
+                               (update_date,))
+                return cursor.fetchone()['total']
+
+    def purge(self, retention_days: int, today: date = None) -> List[str]:
+        """删除整月都早于保留期的分区
+
+        Returns:
+            被删除的分区名
+        """
+        cutoff = (today or date.today()) - timedelta(days=retention_days)
+        expired = [
+            self.partition_name(month)
+            for month in self.get_partitions()
+            if _next_month(month) <= cutoff
+        ]
+        if expired:
+            with self.db_connection.get_connection() as conn:
+                with conn.cursor() as cursor:
+                    cursor.execute(f"ALTER TABLE {self.TABLE} DROP PARTITION {', '.join(expired)}")
+            logger.info(f"删除过期分区: {', '.join(expired)}")
+        return expired
+
+    def load(self, symbol: str, start_date: date, end_date: date) -> List[Dict]:
+        """读取单个品种在日期区间内的快照（按日期升序）"""
+        with self.db_connection.get_connection() as conn:
+            with conn.cursor() as cursor:
+                cursor.execute(f"""
+                    SELECT update_date, {', '.join(self.COLUMNS)}
+                    FROM {self.TABLE}
+                    WHERE symbol = %s AND update_date BETWEEN %s AND %s
+                    ORDER BY update_date
+                """, (symbol, start_date, end_date))
+                return cursor.fetchall()
@@ -0,0 +1,128 @@
+import threading
+import time
+from config import Config
+
+
+class RateLimiter:
+    """线程安全的令牌桶限流器
+
+    以固定速率补充令牌，桶容量决定允许的突发请求数。
+    调用方在发起请求前调用 acquire，只在令牌不足时等待所需的最短时间。
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        """
+        Args:
+            rate: 每秒补充的令牌数
+            capacity: 桶容量（允许的突发量），默认等于 rate
+        """
+        if rate <= 0:
+            raise ValueError("rate 必须大于0")
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        """按流逝时间补充令牌"""
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def acquire(self, weight: float = 1) -> float:
+        """获取令牌，不足时阻塞等待
+
+        Args:
+            weight: 本次请求消耗的令牌数
+
+        Returns:
+            实际等待的秒数
+        """
+        weight = min(float(weight), self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= weight:
+                    self._tokens -= weight
+                    return waited
+                wait_time = (weight - self._tokens) / self.rate
+            time.sleep(wait_time)
+            waited += wait_time
+
+    def drain(self, seconds: float):
+        """清空令牌并透支指定秒数的额度，之后的请求至少等待该时长"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = -seconds * self.rate
+
+
+# Gate.io 期货接口所属的限频桶及权重
+# 公共接口按 IP 限频，私有接口按 API Key 限频；下单接口的限额是其他私有接口的5倍，
+# 因此在私有桶中按 0.2 的权重计算
+ENDPOINT_WEIGHTS = {
+    'list_futures_contracts': ('public', 1),
+    'get_futures_contract': ('public', 1),
+    'list_futures_candlesticks': ('public', 1),
+    'list_futures_tickers': ('public', 1),
+    'list_positions': ('private', 1),
+    'update_position_leverage': ('private', 1),
+    'create_futures_order': ('private', 0.2),
+}
+
+
+class ExchangeRateLimiter:
+    """进程级交易所限流器
+
+    公共接口共用一个令牌桶，私有接口按 API Key 各自维护令牌桶。
+    """
+
+    def __init__(self, public_rate: float, private_rate: float, burst_seconds: float = 1):
+        """
+        Args:
+            public_rate: 公共接口每秒请求数
+            private_rate: 每个 API Key 的私有接口每秒请求数
+            burst_seconds: 桶容量对应的秒数
+        """
+        self.public_rate = public_rate
+        self.private_rate = private_rate
+        self.burst_seconds = burst_seconds
+        self._public = RateLimiter(public_rate, public_rate * burst_seconds)
+        self._private = {}
+        self._lock = threading.Lock()
+
+    def _get_bucket(self, kind: str, api_key: str = None) -> RateLimiter:
+        """获取接口对应的令牌桶"""
+        if kind == 'public':
+            return self._public
+        with self._lock:
+            bucket = self._private.get(api_key)
+            if bucket is None:
+                bucket = RateLimiter(self.private_rate, self.private_rate * self.burst_seconds)
+                self._private[api_key] = bucket
+            return bucket
+
+    def acquire(self, endpoint: str, api_key: str = None) -> float:
+        """在调用接口前获取令牌
+
+        Args:
+            endpoint: FuturesApi 方法名
+            api_key: 私有接口使用的 API Key
+
+        Returns:
+            实际等待的秒数
+        """
+        kind, weight = ENDPOINT_WEIGHTS.get(endpoint, ('private' if api_key else 'public', 1))
+        return self._get_bucket(kind, api_key).acquire(weight)
+
+    def backoff(self, endpoint: str, api_key: str = None, seconds: float = 1):
+        """收到 429 后清空对应令牌桶，使后续请求暂停指定秒数"""
+        kind, _ = ENDPOINT_WEIGHTS.get(endpoint, ('private' if api_key else 'public', 1))
+        self._get_bucket(kind, api_key).drain(seconds)
+
+
+# 所有 DataManager 实例共享的限流器
+exchange_rate_limiter = ExchangeRateLimiter(Config.GATE_PUBLIC_RATE, Config.GATE_PRIVATE_RATE)
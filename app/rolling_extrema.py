@@ -0,0 +1,145 @@
+import json
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from app import db
+from app.models import PriceRangeState
+
+
+class RollingExtrema:
+    """滚动窗口最高/最低收盘价
+
+    使用单调双端队列维护最近 max_window 根K线的极值：
+    最高价队列中收盘价单调递减，最低价队列中收盘价单调递增，队列元素为 (timestamp, close)。
+    对于任意不超过 max_window 的窗口，队列中第一个落在窗口内的元素就是该窗口的极值，
+    因此 20 日、55 日等多个窗口可以由同一个结构回答。追加一根K线的均摊复杂度为 O(1)。
+    """
+
+    def __init__(self, max_window: int):
+        self.max_window = max_window
+        self._window = deque()  # 最近 max_window 根K线 (timestamp, close)
+        self._max = deque()
+        self._min = deque()
+
+    @classmethod
+    def from_closes(cls, close_prices: List[float], max_window: Optional[int] = None) -> 'RollingExtrema':
+        """由收盘价列表构建，按列表顺序作为时间序列"""
+        extrema = cls(max_window or max(len(close_prices), 1))
+        for index, close in enumerate(close_prices):
+            extrema.push(index, close)
+        return extrema
+
+    @property
+    def count(self) -> int:
+        """窗口内的K线数量"""
+        return len(self._window)
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        return self._window[-1][0] if self._window else None
+
+    @property
+    def last_close(self) -> Optional[float]:
+        return self._window[-1][1] if self._window else None
+
+    def push(self, timestamp: int, close: float):
+        """追加一根K线
+
+        时间戳等于最后一根K线时视为对该K线的修正（收盘价不变时忽略），早于最后一根的K线会被忽略。
+        """
+        if self._window and timestamp <= self._window[-1][0]:
+            if timestamp < self._window[-1][0] or close == self._window[-1][1]:
+                return
+            # 收盘价确实被修正时才重建单调队列（O(窗口长度)）
+            self._window[-1] = (timestamp, close)
+            self._rebuild()
+            return
+
+        self._window.append((timestamp, close))
+        self._push_monotonic(timestamp, close)
+
+        if len(self._window) > self.max_window:
+            oldest_timestamp = self._window.popleft()[0]
+            while self._max and self._max[0][0] <= oldest_timestamp:
+                self._max.popleft()
+            while self._min and self._min[0][0] <= oldest_timestamp:
+                self._min.popleft()
+
+    def _push_monotonic(self, timestamp: int, close: float):
+        while self._max and self._max[-1][1] <= close:
+            self._max.pop()
+        self._max.append((timestamp, close))
+        while self._min and self._min[-1][1] >= close:
+            self._min.pop()
+        self._min.append((timestamp, close))
+
+    def _rebuild(self):
+        self._max.clear()
+        self._min.clear()
+        for timestamp, close in self._window:
+            self._push_monotonic(timestamp, close)
+
+    def _window_start(self, window: int) -> int:
+        if window > self.max_window:
+            raise ValueError(f"窗口 {window} 超过最大窗口 {self.max_window}")
+        return self._window[-min(window, len(self._window))][0]
+
+    def high(self, window: int) -> Tuple[int, float]:
+        """最近 window 根K线的最高收盘价，返回 (timestamp, close)"""
+        start = self._window_start(window)
+        return next(item for item in self._max if item[0] >= start)
+
+    def low(self, window: int) -> Tuple[int, float]:
+        """最近 window 根K线的最低收盘价，返回 (timestamp, close)"""
+        start = self._window_start(window)
+        return next(item for item in self._min if item[0] >= start)
+
+    def to_dict(self) -> dict:
+        return {
+            'max_window': self.max_window,
+            'window': list(self._window),
+            'max': list(self._max),
+            'min': list(self._min),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, max_window: Optional[int] = None) -> 'RollingExtrema':
+        """从持久化数据恢复；最大窗口变化时按新窗口重建"""
+        stored_window = data['max_window']
+        extrema = cls(max_window or stored_window)
+        if extrema.max_window == stored_window:
+            extrema._window = deque(tuple(item) for item in data['window'])
+            extrema._max = deque(tuple(item) for item in data['max'])
+            extrema._min = deque(tuple(item) for item in data['min'])
+        else:
+            for timestamp, close in data['window']:
+                extrema.push(timestamp, close)
+        return extrema
+
+
+class RollingExtremaStore:
+    """滚动极值状态的持久化（price_range_state 表）
+
+    需要在 Flask 应用上下文中调用；save 只写入会话，由调用方统一提交事务。
+    """
+
+    def load_all(self, interval: str, max_window: int) -> Dict[str, RollingExtrema]:
+        """加载指定周期下所有品种的状态"""
+        states = {}
+        for row in PriceRangeState.query.filter_by(interval=interval).all():
+            states[row.symbol] = RollingExtrema.from_dict(json.loads(row.state), max_window)
+        return states
+
+    def save(self, symbol: str, interval: str, extrema: RollingExtrema):
+        """写入（或覆盖）一个品种的状态"""
+        stmt = mysql_insert(PriceRangeState).values(
+            symbol=symbol,
+            interval=interval,
+            last_timestamp=extrema.last_timestamp,
+            state=json.dumps(extrema.to_dict())
+        )
+        stmt = stmt.on_duplicate_key_update(
+            last_timestamp=stmt.inserted.last_timestamp,
+            state=stmt.inserted.state
+        )
+        db.session.execute(stmt)
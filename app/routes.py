@@ -5,7 +5,8 @@ from app import db
 from app.models import User, PriceRange20d, MonitorList, SyncStatus, OscillationMonitor
 from app.auth import AuthService
 from app.data_manager import DataManager
-from app.database import DatabaseManager
+from app.database import DatabaseManager, pool_stats
+from app.clock_offset import clock_stats
 import logging
 from typing import Optional
 
@@ -152,6 +153,18 @@ def get_futures_contracts():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@main_bp.route('/api/clock_offset')
+@login_required
+def get_clock_offset():
+    """交易所时钟偏差指标"""
+    return jsonify(clock_stats())
+
+@main_bp.route('/api/db_pool')
+@login_required
+def get_db_pool_stats():
+    """数据库连接池指标"""
+    return jsonify(pool_stats())
+
 @main_bp.route('/api/import_contracts', methods=['POST'])
 @login_required
 def import_contracts():
@@ -823,6 +836,8 @@ def get_price_ranges():
             'min_volume': float(request.args.get('min_volume')) if request.args.get('min_volume') else None,
             'max_volume': float(request.args.get('max_volume')) if request.args.get('max_volume') else None,
             'symbol': request.args.get('symbol'),
+            'interval': request.args.get('interval'),
+            'window': int(request.args.get('window')) if request.args.get('window') else None,
             'page': page,
             'per_page': per_page,
             'exclude_status': ['CLOSED']  # 添加状态过滤，排除已关闭的记录
@@ -864,6 +879,51 @@ def get_price_ranges():
             'message': f'服务器错误: {str(e)}'
         }), 500
 
+@main_bp.route('/api/price_range_history')
+@login_required
+def get_price_range_history():
+    """获取单个品种的价格范围历史（振幅、位置比随时间的变化）"""
+    try:
+        symbol = request.args.get('symbol')
+        days = int(request.args.get('days', 90))
+        if not symbol:
+            return jsonify({
+                'status': 'error',
+                'message': '未指定品种'
+            }), 400
+
+        server_id = request.headers.get('X-Server-ID')
+        if not server_id:
+            return jsonify({
+                'status': 'error',
+                'message': '未指定服务器ID'
+            }), 400
+
+        data_manager = DataManager(server_id)
+        data = data_manager.get_price_range_history(symbol.upper(), days)
+        
+        return jsonify({
+            'status': 'success',
+            'data': [
+                {**row, 'update_date': row['update_date'].isoformat()}
+                for row in data
+            ]
+        })
+        
+    except ValueError as e:
+        logger.error(f"参数错误: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': f'参数错误: {str(e)}'
+        }), 400
+        
+    except Exception as e:
+        logger.error(f"获取价格范围历史失败: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': f'服务器错误: {str(e)}'
+        }), 500
+
 @main_bp.route('/api/save_monitor_symbols', methods=['POST'])
 @login_required
 def save_monitor_symbols():
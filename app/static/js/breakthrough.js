@@ -109,11 +109,17 @@ function getFilterValues() {
         maxPosition: document.getElementById('maxPosition'),
         minVolume: document.getElementById('minVolume'),
         maxVolume: document.getElementById('maxVolume'),
-        symbol: document.getElementById('symbol-search')
+        symbol: document.getElementById('symbol-search'),
+        window: document.getElementById('rangeWindow')
     };
 
     const filters = {};
 
+    // 处理区间天数
+    if (inputs.window?.value) {
+        filters.window = parseInt(inputs.window.value);
+    }
+
     // 处理振幅条件 - 直接使用百分比值
     if (inputs.minAmplitude?.value) {
         const value = parseFloat(inputs.minAmplitude.value);
@@ -431,7 +437,7 @@ function loadSymbolData() {
         'min_amplitude', 'max_amplitude',
         'min_position', 'max_position',
         'min_volume', 'max_volume',
-        'symbol'
+        'symbol', 'window'
     ];
     
     paramKeys.forEach(key => {
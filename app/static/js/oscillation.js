@@ -348,11 +348,17 @@ function getFilterValues() {
         maxPosition: document.getElementById('maxPosition'),
         minVolume: document.getElementById('minVolume'),
         maxVolume: document.getElementById('maxVolume'),
-        symbol: document.getElementById('symbol-search')
+        symbol: document.getElementById('symbol-search'),
+        interval: document.getElementById('rangeInterval')
     };
 
     const filters = {};
 
+    // 处理K线周期
+    if (inputs.interval?.value) {
+        filters.interval = inputs.interval.value;
+    }
+
     // 处理振幅条件 - 直接使用百分比值
     if (inputs.minAmplitude?.value) {
         const value = parseFloat(inputs.minAmplitude.value);
@@ -0,0 +1,113 @@
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+from app import setup_logging
+from config import Config
+
+logger = setup_logging(
+    'ticker_snapshot',
+    os.path.join('logs', 'ticker_snapshot.log')
+)
+
+
+class TickerView:
+    """一次全量行情的只读视图"""
+
+    def __init__(self, tickers: Dict[str, object], fetched_at: float):
+        self.tickers = tickers  # 品种代码（不含 _USDT 后缀）-> FuturesTicker
+        self.fetched_at = fetched_at  # time.monotonic() 时间
+
+    @property
+    def age(self) -> float:
+        """行情距获取时的秒数"""
+        return time.monotonic() - self.fetched_at
+
+    def get(self, symbol: str):
+        return self.tickers.get(symbol)
+
+    def __len__(self):
+        return len(self.tickers)
+
+
+class TickerSnapshot:
+    """进程级全量行情快照
+
+    所有调用方共享一份 list_futures_tickers 结果，调用方通过 max_age 指定可接受的行情年龄，
+    快照过旧时才重新获取；同时发起的刷新请求合并为一次获取，其他线程等待结果。
+    """
+
+    def __init__(self, max_age: float):
+        """
+        Args:
+            max_age: 默认可接受的行情年龄（秒）
+        """
+        self.max_age = max_age
+        self._view = None
+        self._refreshing = False
+        self._error = None
+        self._condition = threading.Condition()
+        self.fetch_count = 0
+
+    @property
+    def age(self) -> float:
+        """当前快照的年龄，尚未获取时为无穷大"""
+        view = self._view
+        return view.age if view else float('inf')
+
+    def peek(self) -> Optional[TickerView]:
+        """返回当前快照（可能已过期），不触发刷新，尚未获取时返回 None"""
+        return self._view
+
+    def _fetch(self, loader: Callable[[], List]) -> TickerView:
+        tickers = loader()
+        return TickerView(
+            {ticker.contract.replace('_USDT', ''): ticker for ticker in tickers},
+            time.monotonic()
+        )
+
+    def get(self, loader: Callable[[], List], max_age: Optional[float] = None) -> TickerView:
+        """获取年龄不超过 max_age 的快照
+
+        Args:
+            loader: 返回 list_futures_tickers 结果的函数，仅在需要刷新时调用
+            max_age: 可接受的行情年龄（秒），默认使用 self.max_age
+
+        Returns:
+            TickerView，刷新失败时抛出获取行情的异常
+        """
+        max_age = self.max_age if max_age is None else max_age
+        with self._condition:
+            while True:
+                view = self._view
+                if view is not None and view.age <= max_age:
+                    return view
+                if not self._refreshing:
+                    break
+                # 其他线程正在刷新，等待其结果
+                self._condition.wait()
+                if self._error is not None and (self._view is None or self._view.age > max_age):
+                    raise self._error
+            self._refreshing = True
+            self._error = None
+
+        try:
+            view = self._fetch(loader)
+        except Exception as e:
+            with self._condition:
+                self._refreshing = False
+                self._error = e
+                self._condition.notify_all()
+            raise
+
+        with self._condition:
+            self._view = view
+            self._refreshing = False
+            self.fetch_count += 1
+            self._condition.notify_all()
+        logger.debug(f"行情快照已刷新: {len(view)} 个合约")
+        return view
+
+
+# 所有 DataManager 实例共享的行情快照
+ticker_snapshot = TickerSnapshot(Config.TICKER_SNAPSHOT_MAX_AGE)
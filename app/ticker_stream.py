@@ -0,0 +1,212 @@
+import json
+import os
+from abc import ABC, abstractmethod
+import threading
+import time
+from collections import namedtuple
+from typing import Callable, Dict, Iterator, List, Optional
+from app import setup_logging
+
+logger = setup_logging(
+    'ticker_stream',
+    os.path.join('logs', 'ticker_stream.log')
+)
+
+# 看板中的行情，字段名与 gate_api 的 FuturesTicker 保持一致，可直接交给 PriceUpdater.write_ticks
+BoardTicker = namedtuple('BoardTicker', ['contract', 'last', 'volume_24h_settle', 'received_at'])
+
+
+class TickerBoard:
+    """线程安全的内存行情看板，保存每个品种的最新价格和24小时成交量"""
+
+    def __init__(self):
+        self._tickers = {}
+        self._lock = threading.Lock()
+
+    def update(self, ticker: dict):
+        """写入一条推送行情（futures.tickers 的 result 元素）"""
+        contract = ticker.get('contract')
+        last = ticker.get('last')
+        if not contract or last in (None, ''):
+            return
+        symbol = contract.replace('_USDT', '')
+        with self._lock:
+            previous = self._tickers.get(symbol)
+            volume = ticker.get('volume_24h_settle')
+            if volume in (None, '') and previous:
+                volume = previous.volume_24h_settle
+            self._tickers[symbol] = BoardTicker(contract, last, volume or 0, time.time())
+
+    def snapshot(self, max_age: Optional[float] = None) -> Dict[str, BoardTicker]:
+        """返回当前看板的副本，键为去掉 _USDT 后缀的品种代码
+
+        Args:
+            max_age: 只返回接收时间不超过该秒数的行情，None 为全部返回
+        """
+        with self._lock:
+            if max_age is None:
+                return dict(self._tickers)
+            cutoff = time.time() - max_age
+            return {symbol: ticker for symbol, ticker in self._tickers.items() if ticker.received_at >= cutoff}
+
+    def __len__(self):
+        with self._lock:
+            return len(self._tickers)
+
+
+class TickerFeed(ABC):
+    """推送行情源
+
+    子类迭代产出 futures.tickers 行情字典（至少包含 contract、last、volume_24h_settle），
+    在 close 被调用后结束迭代。
+    """
+
+    @abstractmethod
+    def __iter__(self) -> Iterator[dict]:
+        """产出推送行情字典"""
+
+    def close(self):
+        pass
+
+
+class GateWebSocketTickerFeed(TickerFeed):
+    """Gate.io 期货 WebSocket 行情源（futures.tickers 频道）
+
+    url 可以指向本地替身服务器，用录制的行情回放进行测试。断线后按指数退避重连，
+    每次连接时通过 contracts_provider 重新获取订阅列表。
+    """
+
+    def __init__(self, url: str, contracts_provider: Callable[[], List[str]],
+                 ping_interval: float = 10, max_backoff: float = 30):
+        self.url = url
+        self.contracts_provider = contracts_provider
+        self.ping_interval = ping_interval
+        self.max_backoff = max_backoff
+        self._ws = None
+        self._closed = threading.Event()
+
+    def _connect(self):
+        import websocket
+
+        ws = websocket.create_connection(self.url, timeout=self.ping_interval)
+        contracts = [f"{symbol}_USDT" for symbol in self.contracts_provider()]
+        ws.send(json.dumps({
+            'time': int(time.time()),
+            'channel': 'futures.tickers',
+            'event': 'subscribe',
+            'payload': contracts
+        }))
+        logger.info(f"已连接推送行情 {self.url}，订阅 {len(contracts)} 个合约")
+        return ws
+
+    def __iter__(self) -> Iterator[dict]:
+        import websocket
+
+        backoff = 1
+        while not self._closed.is_set():
+            try:
+                self._ws = self._connect()
+                backoff = 1
+                last_ping = time.monotonic()
+                while not self._closed.is_set():
+                    if time.monotonic() - last_ping >= self.ping_interval:
+                        self._ws.send(json.dumps({'time': int(time.time()), 'channel': 'futures.ping'}))
+                        last_ping = time.monotonic()
+                    try:
+                        message = json.loads(self._ws.recv())
+                    except websocket.WebSocketTimeoutException:
+                        continue
+                    if message.get('channel') != 'futures.tickers' or message.get('event') != 'update':
+                        continue
+                    for ticker in message.get('result') or []:
+                        yield ticker
+            except Exception as e:
+                if self._closed.is_set():
+                    break
+                logger.error(f"推送行情连接异常: {str(e)}，{backoff} 秒后重连")
+                self._closed.wait(backoff)
+                backoff = min(backoff * 2, self.max_backoff)
+            finally:
+                if self._ws:
+                    try:
+                        self._ws.close()
+                    except Exception:
+                        pass
+                    self._ws = None
+
+    def close(self):
+        self._closed.set()
+        if self._ws:
+            try:
+                self._ws.close()
+            except Exception:
+                pass
+
+
+class JsonLinesTickerFeed(TickerFeed):
+    """从录制文件回放推送行情
+
+    文件每行是一条原始 WebSocket 消息（JSON），按消息中的 time 字段以 speed 倍速回放。
+    """
+
+    def __init__(self, path: str, speed: float = 1.0):
+        self.path = path
+        self.speed = speed
+        self._closed = threading.Event()
+
+    def __iter__(self) -> Iterator[dict]:
+        first_time = None
+        started = time.monotonic()
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                if self._closed.is_set():
+                    break
+                line = line.strip()
+                if not line:
+                    continue
+                message = json.loads(line)
+                if message.get('channel') != 'futures.tickers' or message.get('event') != 'update':
+                    continue
+                message_time = message.get('time', 0)
+                if first_time is None:
+                    first_time = message_time
+                delay = (message_time - first_time) / self.speed - (time.monotonic() - started)
+                if delay > 0 and self._closed.wait(delay):
+                    break
+                for ticker in message.get('result') or []:
+                    yield ticker
+
+    def close(self):
+        self._closed.set()
+
+
+class TickerStreamer:
+    """在后台线程消费行情源，持续更新行情看板"""
+
+    def __init__(self, feed: TickerFeed, board: TickerBoard = None):
+        self.feed = feed
+        self.board = board or TickerBoard()
+        self.message_count = 0
+        self._thread = None
+
+    def _consume(self):
+        try:
+            for ticker in self.feed:
+                self.board.update(ticker)
+                self.message_count += 1
+        except Exception as e:
+            logger.error(f"推送行情消费失败: {str(e)}")
+        logger.info("推送行情消费线程结束")
+
+    def start(self):
+        self._thread = threading.Thread(target=self._consume, name='ticker-stream', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5):
+        self.feed.close()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def is_alive(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
@@ -0,0 +1,211 @@
+"""测量登录时加载账户信息（DatabaseManager.get_account_info）的耗时与账户数的关系
+
+在 DB1_* 指定的 MySQL 服务器上创建独立的测试库（默认 bench_ckapp，可用 BENCH_DB_NAME 指定），
+为每个账户数生成一个测试用户及其账户、产品组合，分别测量当前的集合查询实现和
+原先逐账户查询的实现（N+1）：
+    python benchmarks/bench_login.py [账户数列表，默认 1,10,50,200] [每账户产品组合数，默认 3] [重复次数，默认 20]
+
+测试库中的数据每次运行前重建（DROP DATABASE）。为避免误删业务库，测试库名必须以 bench_ 开头，
+且不能与 Config.DATABASES 中任何一个库同名，否则拒绝运行。
+"""
+import os
+import sys
+import time
+
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_dir not in sys.path:
+    sys.path.insert(0, project_dir)
+
+BENCH_DB_PREFIX = 'bench_'
+BENCH_DB_NAME = os.environ.get('BENCH_DB_NAME', 'bench_ckapp')
+
+SCHEMA = [
+    """CREATE TABLE users (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        username VARCHAR(64) NOT NULL UNIQUE,
+        email VARCHAR(120) NOT NULL,
+        password_hash VARCHAR(128)
+    )""",
+    """CREATE TABLE user_accounts (
+        user_id INT NOT NULL,
+        acct_id INT NOT NULL,
+        PRIMARY KEY (user_id, acct_id)
+    )""",
+    """CREATE TABLE acct_info (
+        acct_id INT PRIMARY KEY,
+        acct_name VARCHAR(64),
+        apikey VARCHAR(128),
+        secretkey VARCHAR(128),
+        apipass VARCHAR(128),
+        email VARCHAR(120),
+        group_id INT,
+        state INT,
+        status INT
+    )""",
+    """CREATE TABLE acct_stg_future_gateio (
+        id INT AUTO_INCREMENT PRIMARY KEY,
+        acct_id INT NOT NULL,
+        product_list VARCHAR(64),
+        name VARCHAR(64),
+        status INT,
+        money DECIMAL(20, 4),
+        discount DECIMAL(10, 4),
+        KEY idx_acct_id (acct_id)
+    )""",
+    """CREATE TABLE stg_comb_product_gateio (
+        product_comb VARCHAR(64) PRIMARY KEY,
+        comb_name VARCHAR(64)
+    )""",
+]
+
+
+def legacy_get_account_info(server_id, username):
+    """原先的实现：先查账户 ID，再查账户信息，然后每个账户查询一次产品组合"""
+    from app.database import DatabaseConnection, DatabaseManager
+
+    acct_ids = DatabaseManager.get_user_accounts(server_id, username)
+    if not acct_ids:
+        return []
+    result = []
+    with DatabaseConnection(server_id).get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT acct_id, acct_name, apikey, secretkey, apipass, email, group_id, state, status "
+                "FROM acct_info WHERE acct_id IN (%s)" % ','.join(['%s'] * len(acct_ids)),
+                tuple(acct_ids)
+            )
+            for account in cursor.fetchall():
+                cursor.execute("""
+                    SELECT asg.product_list, asg.name, asg.status, asg.money, asg.discount, scp.comb_name
+                    FROM acct_stg_future_gateio asg
+                    LEFT JOIN stg_comb_product_gateio scp ON asg.product_list = scp.product_comb
+                    WHERE asg.acct_id = %s
+                """, (account['acct_id'],))
+                result.append((account, cursor.fetchall()))
+    return result
+
+
+def bench_config():
+    """返回把 server1 指向测试库的配置类
+
+    测试库名不以 bench_ 开头或与业务库同名时退出，prepare_database 会删除并重建该库。
+    """
+    from config import Config, database_binds, database_uri
+
+    business_names = sorted({db_config['NAME'] for db_config in Config.DATABASES.values()})
+    if not BENCH_DB_NAME.startswith(BENCH_DB_PREFIX) or BENCH_DB_NAME in business_names:
+        sys.exit(f"拒绝运行：测试库名必须以 {BENCH_DB_PREFIX} 开头且不能是业务库（{', '.join(business_names)}），"
+                 f"当前 BENCH_DB_NAME={BENCH_DB_NAME}")
+
+    databases = {server_id: dict(db_config) for server_id, db_config in Config.DATABASES.items()}
+    databases['server1']['NAME'] = BENCH_DB_NAME
+
+    class BenchConfig(Config):
+        DATABASES = databases
+        DB_CONFIG = databases[Config.DEFAULT_DATABASE]
+        SQLALCHEMY_DATABASE_URI = database_uri(DB_CONFIG)
+        SQLALCHEMY_BINDS = database_binds(databases, Config.DEFAULT_DATABASE, Config.SQLALCHEMY_ENGINE_OPTIONS)
+
+    return BenchConfig
+
+
+def prepare_database(config):
+    """创建测试库并建表（已存在时重建）"""
+    import pymysql
+
+    db_config = config.DATABASES['server1']
+    connection = pymysql.connect(
+        host=db_config['HOST'],
+        user=db_config['USER'],
+        password=db_config['PASSWORD'],
+        port=db_config['PORT'],
+        charset='utf8mb4'
+    )
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP DATABASE IF EXISTS `{BENCH_DB_NAME}`")
+            cursor.execute(f"CREATE DATABASE `{BENCH_DB_NAME}` DEFAULT CHARACTER SET utf8mb4")
+            cursor.execute(f"USE `{BENCH_DB_NAME}`")
+            for statement in SCHEMA:
+                cursor.execute(statement)
+            cursor.executemany(
+                "INSERT INTO stg_comb_product_gateio (product_comb, comb_name) VALUES (%s, %s)",
+                [(f"COMB{index}", f"组合{index}") for index in range(10)]
+            )
+        connection.commit()
+    finally:
+        connection.close()
+
+
+def create_user(username, account_count, products_per_account, first_acct_id):
+    """在测试库中创建一个关联 account_count 个账户的用户"""
+    from app.database import DatabaseConnection
+
+    with DatabaseConnection('1').get_connection() as conn:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO users (username, email) VALUES (%s, %s)",
+                (username, f"{username}@bench.local")
+            )
+            user_id = cursor.lastrowid
+            acct_ids = list(range(first_acct_id, first_acct_id + account_count))
+            cursor.executemany(
+                "INSERT INTO acct_info (acct_id, acct_name, apikey, secretkey, apipass, email, group_id, state, status) "
+                "VALUES (%s, %s, %s, %s, '', '', 3, 1, 1)",
+                [(acct_id, f"账户{acct_id}", f"key{acct_id}", f"secret{acct_id}") for acct_id in acct_ids]
+            )
+            cursor.executemany(
+                "INSERT INTO user_accounts (user_id, acct_id) VALUES (%s, %s)",
+                [(user_id, acct_id) for acct_id in acct_ids]
+            )
+            cursor.executemany(
+                "INSERT INTO acct_stg_future_gateio (acct_id, product_list, name, status, money, discount) "
+                "VALUES (%s, %s, %s, 1, 1000, 1)",
+                [(acct_id, f"COMB{index % 10}", f"策略{index}")
+                 for acct_id in acct_ids for index in range(products_per_account)]
+            )
+
+
+def measure(func, repeats):
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        durations.append(time.perf_counter() - start)
+    durations.sort()
+    return durations[len(durations) // 2], durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+
+
+def main():
+    account_counts = [int(value) for value in sys.argv[1].split(',')] if len(sys.argv) > 1 else [1, 10, 50, 200]
+    products_per_account = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    repeats = int(sys.argv[3]) if len(sys.argv) > 3 else 20
+
+    config = bench_config()
+    prepare_database(config)
+
+    from app import create_app
+    from app.database import DatabaseManager
+
+    app = create_app(config)
+    with app.app_context():
+        first_acct_id = 1
+        print(f"每账户产品组合数: {products_per_account}, 重复次数: {repeats}")
+        print(f"{'账户数':>6} {'集合查询 P50':>14} {'P95':>10} {'逐账户查询 P50':>16} {'P95':>10}")
+        for count in account_counts:
+            username = f"bench_user_{count}"
+            create_user(username, count, products_per_account, first_acct_id)
+            first_acct_id += count
+
+            accounts = DatabaseManager.get_account_info('1', username)
+            assert len(accounts) == count
+            assert all(len(account.stg_comb_product_gateio) == products_per_account for account in accounts)
+
+            current = measure(lambda: DatabaseManager.get_account_info('1', username), repeats)
+            legacy = measure(lambda: legacy_get_account_info('1', username), repeats)
+            print(f"{count:>6} {current[0] * 1000:>11.2f} ms {current[1] * 1000:>7.2f} ms "
+                  f"{legacy[0] * 1000:>13.2f} ms {legacy[1] * 1000:>7.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
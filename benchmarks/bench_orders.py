@@ -0,0 +1,125 @@
+"""用本地替身服务压测下单、持仓查询和平仓
+
+每个模拟账户使用独立的 API Key，依次执行 开仓 -> 查询持仓 -> 平仓，统计各操作的耗时分布和失败数：
+    python benchmarks/bench_orders.py [账户数] [每账户轮数] [并发线程数] [--host URL]
+                                      [--latency 毫秒] [--error-rate 比例] [--private-rate 每秒请求数]
+
+耗时分布只统计成功的操作。替身服务未注入错误（--error-rate 为 0）时出现失败说明调用本身有问题，
+压测结果不可用，脚本以非零状态退出；失败原因见 logs/data_manager.log。
+
+不指定 --host 时在进程内启动替身服务（gate_standin.start_standin）；
+账户数较多时建议单独运行 gate_standin.py 并通过 --host 指定，避免服务端与压测客户端争用 GIL。
+"""
+import argparse
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_dir not in sys.path:
+    sys.path.insert(0, project_dir)
+
+
+def percentile(durations, ratio):
+    return durations[min(len(durations) - 1, int(len(durations) * ratio))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='用本地替身服务压测下单、持仓查询和平仓')
+    parser.add_argument('accounts', type=int, nargs='?', default=100, help='模拟账户数')
+    parser.add_argument('rounds', type=int, nargs='?', default=3, help='每个账户的轮数')
+    parser.add_argument('workers', type=int, nargs='?', default=50, help='并发线程数')
+    parser.add_argument('--host', help='已运行的替身服务地址，如 http://127.0.0.1:18080/api/v4')
+    parser.add_argument('--symbol', default='BTC', help='下单品种')
+    parser.add_argument('--amount', type=float, default=100, help='每次开仓金额（USDT）')
+    parser.add_argument('--latency', type=float, default=20, help='进程内替身服务的平均响应延迟（毫秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='进程内替身服务的错误率')
+    parser.add_argument('--private-rate', type=float, default=0.0, help='进程内替身服务每个 Key 的私有接口限频')
+    args = parser.parse_args()
+
+    from app.data_manager import DataManager
+    from app.models import AccountInfo
+    from app.api_clients import api_client_registry
+    from app.clock_offset import clock_stats
+    from gate_standin import start_standin
+
+    server = None
+    host = args.host
+    if not host:
+        server = start_standin(
+            latency=args.latency,
+            jitter=args.latency / 4,
+            error_rate=args.error_rate,
+            private_rate=args.private_rate
+        )
+        host = server.host
+    print(f"替身服务: {host}, 账户数: {args.accounts}, 轮数: {args.rounds}, 并发: {args.workers}")
+
+    durations = defaultdict(list)
+    failures = defaultdict(int)
+    errors = {}
+
+    def timed(name, func, *func_args):
+        start = time.perf_counter()
+        try:
+            # create_order / close_position 失败时返回 False，_get_account_positions 失败时返回 None
+            ok = func(*func_args) not in (None, False)
+        except Exception as e:
+            errors.setdefault(name, repr(e))
+            ok = False
+        if ok:
+            durations[name].append(time.perf_counter() - start)
+        else:
+            failures[name] += 1
+
+    def run_account(index):
+        account = AccountInfo(
+            acct_id=str(index),
+            acct_name=f"standin-{index}",
+            apikey=f"standin-key-{index:06d}",
+            secretkey='standin-secret',
+            apipass='',
+            email='',
+            group_id=0,
+            state=1,
+            status=1,
+            stg_comb_product_gateio=[]
+        )
+        data_manager = DataManager('1', host=host)
+        data_manager.init_api(account)
+        for _ in range(args.rounds):
+            timed('create_order', data_manager.create_order, account, args.symbol, 'long', args.amount, 5)
+            timed('list_positions', data_manager._get_account_positions, account, True)
+            timed('close_position', data_manager.close_position, account, args.symbol)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        list(executor.map(run_account, range(args.accounts)))
+    elapsed = time.perf_counter() - started
+
+    total = sum(len(values) for values in durations.values())
+    failed = sum(failures.values())
+    print(f"总耗时: {elapsed:.2f} s, 成功操作数: {total}, 失败操作数: {failed}, 吞吐: {total / elapsed:.1f} ops/s")
+    for name in ('create_order', 'list_positions', 'close_position'):
+        values = sorted(durations[name])
+        if not values:
+            print(f"{name}: 全部失败 {failures[name]} 次")
+            continue
+        print(f"{name}: 成功 {len(values)}, 失败 {failures[name]}, "
+              f"P50 {percentile(values, 0.5) * 1000:.1f} ms, P95 {percentile(values, 0.95) * 1000:.1f} ms, "
+              f"P99 {percentile(values, 0.99) * 1000:.1f} ms, 最大 {values[-1] * 1000:.1f} ms")
+    for name, error in errors.items():
+        print(f"{name} 异常: {error}")
+    print(f"API 客户端: {api_client_registry.stats()}")
+    print(f"时钟偏差: {clock_stats()}")
+    if server:
+        server.shutdown()
+    if failed and not args.error_rate:
+        print(f"未注入错误却有 {failed} 次操作失败，压测结果无效（见 logs/data_manager.log）", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
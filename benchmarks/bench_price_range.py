@@ -0,0 +1,66 @@
+"""价格范围计算基准：逐品种标量计算 vs NumPy 批量计算
+
+用法：
+    python benchmarks/bench_price_range.py [品种数] [重复次数]
+"""
+import os
+import sys
+import time
+import random
+
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_dir not in sys.path:
+    sys.path.insert(0, project_dir)
+
+from app.price_updater import PriceUpdater
+
+
+def make_close_series(symbol_count: int, days: int):
+    """生成随机游走收盘价，约10%的品种K线不足"""
+    close_series = {}
+    for index in range(symbol_count):
+        length = days if random.random() > 0.1 else random.randint(1, days - 1)
+        price = random.uniform(0.01, 50000)
+        closes = []
+        for _ in range(length):
+            price *= 1 + random.gauss(0, 0.03)
+            closes.append(price)
+        close_series[f"SYM{index}"] = closes
+    return close_series
+
+
+def main():
+    symbol_count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    updater = PriceUpdater()
+    close_series = make_close_series(symbol_count, updater.price_range_days)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        scalar = {}
+        for symbol, closes in close_series.items():
+            price_data = updater.calculate_price_range(closes)
+            if price_data:
+                scalar[symbol] = price_data
+    scalar_time = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        batch = updater.calculate_price_ranges(close_series)
+    batch_time = (time.perf_counter() - start) / repeat
+
+    # 校验两种实现结果一致
+    assert scalar.keys() == batch.keys()
+    for symbol, price_data in scalar.items():
+        for field, value in price_data.items():
+            assert abs(value - batch[symbol][field]) <= 1e-9 * max(1.0, abs(value)), (symbol, field)
+
+    print(f"品种数: {symbol_count}, 有效品种: {len(batch)}, 重复次数: {repeat}")
+    print(f"标量计算: {scalar_time * 1000:.2f} ms/次")
+    print(f"批量计算: {batch_time * 1000:.2f} ms/次")
+    print(f"加速比: {scalar_time / batch_time:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""回放录制的行情，测量实时行情更新和持仓同步的完整周期耗时
+
+先在正常运行时录制接口响应：
+    MARKET_REPLAY_MODE=record MARKET_REPLAY_FILE=day.jsonl.gz python run_updater.py
+
+再离线回放（需要本地数据库中有 price_range_20d 等表）：
+    python benchmarks/bench_replay.py day.jsonl.gz [tick|sync] [周期数] [倍速] [--profile]
+
+倍速为0（默认）时为步进模式：每个周期前进到下一次录制的行情，结果可重复。
+"""
+import os
+import sys
+import time
+import cProfile
+import pstats
+
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_dir not in sys.path:
+    sys.path.insert(0, project_dir)
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if arg != '--profile']
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+    profile = '--profile' in sys.argv
+    target = args[1] if len(args) > 1 else 'tick'
+    cycles = int(args[2]) if len(args) > 2 else 100
+
+    # 回放配置需要在导入应用模块之前设置
+    os.environ['MARKET_REPLAY_MODE'] = 'replay'
+    os.environ['MARKET_REPLAY_FILE'] = args[0]
+    os.environ['MARKET_REPLAY_SPEED'] = args[3] if len(args) > 3 else '0'
+    os.environ['TICKER_SNAPSHOT_MAX_AGE'] = '0'  # 每个周期都获取回放的下一次行情
+
+    from app.market_replay import get_replay
+    from app.price_updater import PriceUpdater
+    from app.position_sync import run_sync_once
+
+    replay = get_replay()
+    if target == 'tick':
+        updater = PriceUpdater()
+        cycle = updater.update_ticks
+    elif target == 'sync':
+        cycle = run_sync_once
+    else:
+        print(f"未知的测试目标: {target}")
+        sys.exit(1)
+
+    profiler = cProfile.Profile() if profile else None
+    durations = []
+    for _ in range(cycles):
+        start = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        cycle()
+        if profiler:
+            profiler.disable()
+        durations.append(time.perf_counter() - start)
+        if replay.finished:
+            break
+
+    durations.sort()
+    count = len(durations)
+    print(f"目标: {target}, 周期数: {count}")
+    print(f"平均: {sum(durations) / count * 1000:.2f} ms")
+    print(f"P50: {durations[count // 2] * 1000:.2f} ms")
+    print(f"P95: {durations[min(count - 1, int(count * 0.95))] * 1000:.2f} ms")
+    print(f"最大: {durations[-1] * 1000:.2f} ms")
+    if target == 'tick' and updater.last_write_metrics:
+        print(f"最后一次写入: {updater.last_write_metrics}")
+    if profiler:
+        pstats.Stats(profiler).sort_stats('cumulative').print_stats(25)
+
+
+if __name__ == '__main__':
+    main()
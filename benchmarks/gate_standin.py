@@ -0,0 +1,541 @@
+"""本地 Gate.io 期货接口替身服务，用于压测和集成测试
+
+实现项目用到的 USDT 永续接口（合约、行情、K线、持仓、杠杆、下单）及 /spot/time，
+每个 API Key 自动对应一个独立的模拟账户，市价 IOC 订单按最新价全部成交。
+可配置响应延迟、错误率、限频（429）和服务器时钟偏差。
+
+单独运行（压测客户端与服务端分进程，避免互相占用 GIL）：
+    python benchmarks/gate_standin.py [--port 18080] [--latency 20] [--jitter 5] [--error-rate 0.01]
+                                      [--private-rate 100] [--public-rate 0] [--clock-skew 0]
+然后让应用指向替身服务：
+    GATE_API_HOST=http://127.0.0.1:18080/api/v4 python run_updater.py
+
+也可以在进程内启动（见 start_standin），bench_orders.py 默认如此。
+"""
+import argparse
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+API_PREFIX = '/api/v4'
+CANDLE_SECONDS = {'1m': 60, '5m': 300, '15m': 900, '30m': 1800, '1h': 3600, '4h': 14400, '8h': 28800, '1d': 86400}
+MAJOR_CONTRACTS = [('BTC', 60000.0), ('ETH', 3000.0), ('SOL', 150.0), ('BNB', 550.0), ('XRP', 0.6), ('DOGE', 0.15)]
+
+
+class StandinError(Exception):
+    """以 Gate.io 错误格式返回的请求错误"""
+
+    def __init__(self, status: int, label: str, message: str = ''):
+        super().__init__(message or label)
+        self.status = status
+        self.label = label
+        self.message = message or label
+
+
+def _fmt(value: float) -> str:
+    return f"{value:.8g}"
+
+
+class StandinMarket:
+    """模拟行情：价格随时间做随机游走，K线按时间戳确定性生成"""
+
+    def __init__(self, contract_count: int, delisting_rate: float = 0.0, seed: int = 42):
+        """
+        Args:
+            contract_count: 合约数量（前几个为主流币，其余为 SYM0001 形式的模拟品种）
+            delisting_rate: 标记为下架中的合约比例
+            seed: 随机种子
+        """
+        rng = random.Random(seed)
+        self.contracts = {}
+        self._prices = {}
+        for index in range(contract_count):
+            if index < len(MAJOR_CONTRACTS):
+                symbol, price = MAJOR_CONTRACTS[index]
+            else:
+                symbol, price = f"SYM{index:04d}", round(10 ** rng.uniform(-2, 3), 4)
+            name = f"{symbol}_USDT"
+            multiplier = 10 ** round(math.log10(10 / price)) if price > 10 else 1
+            self.contracts[name] = {
+                'name': name,
+                'type': 'direct',
+                'quanto_multiplier': _fmt(min(multiplier, 1)),
+                'leverage_min': '1',
+                'leverage_max': '100' if index < len(MAJOR_CONTRACTS) else '50',
+                'maintenance_rate': '0.005',
+                'mark_type': 'index',
+                'order_price_round': '0.0001',
+                'mark_price_round': '0.0001',
+                'order_size_min': 1,
+                'order_size_max': 1000000,
+                'in_delisting': index >= len(MAJOR_CONTRACTS) and rng.random() < delisting_rate,
+            }
+            self._prices[name] = price
+        self._updated_at = time.time()
+        self._rng = rng
+        self._lock = threading.Lock()
+
+    def _step(self):
+        """按距上次更新的时间推进价格（调用方持有锁）"""
+        now = time.time()
+        elapsed = now - self._updated_at
+        if elapsed < 0.5:
+            return
+        self._updated_at = now
+        volatility = 0.0005 * math.sqrt(elapsed)
+        for name, price in self._prices.items():
+            self._prices[name] = price * math.exp(self._rng.gauss(0, volatility))
+
+    def price(self, name: str) -> float:
+        with self._lock:
+            self._step()
+            return self._prices[name]
+
+    def prices(self) -> dict:
+        with self._lock:
+            self._step()
+            return dict(self._prices)
+
+    def contract(self, name: str) -> dict:
+        contract = self.contracts.get(name)
+        if contract is None:
+            raise StandinError(400, 'CONTRACT_NOT_FOUND', f"contract {name} not found")
+        price = _fmt(self.price(name))
+        return dict(contract, mark_price=price, index_price=price, last_price=price)
+
+    def tickers(self, name: str = None) -> list:
+        prices = self.prices()
+        names = [name] if name else list(prices)
+        result = []
+        for contract in names:
+            if contract not in prices:
+                raise StandinError(400, 'CONTRACT_NOT_FOUND', f"contract {contract} not found")
+            last = prices[contract]
+            result.append({
+                'contract': contract,
+                'last': _fmt(last),
+                'mark_price': _fmt(last),
+                'index_price': _fmt(last),
+                'change_percentage': '0',
+                'low_24h': _fmt(last * 0.97),
+                'high_24h': _fmt(last * 1.03),
+                'volume_24h': '1000000',
+                'volume_24h_quote': _fmt(last * 1000000),
+                'funding_rate': '0.0001',
+            })
+        return result
+
+    def candlesticks(self, name: str, interval: str, start: int = None, end: int = None, limit: int = None) -> list:
+        """生成 K 线，同一合约同一时间的 K 线每次请求结果相同"""
+        if name not in self.contracts:
+            raise StandinError(400, 'CONTRACT_NOT_FOUND', f"contract {name} not found")
+        step = CANDLE_SECONDS.get(interval)
+        if step is None:
+            raise StandinError(400, 'INVALID_PARAM_VALUE', f"invalid interval {interval}")
+        last_open = int(time.time()) // step * step
+        end = min(int(end) if end else last_open, last_open) // step * step
+        if start:
+            start = -(-int(start) // step) * step
+        else:
+            start = end - (int(limit or 100) - 1) * step
+        if (end - start) // step >= 2000:
+            raise StandinError(400, 'INVALID_PARAM_VALUE', 'too many points requested')
+
+        base = self.price(name)
+        candles = []
+        for t in range(start, end + 1, step):
+            rng = random.Random(f"{name}:{interval}:{t}")
+            # 以当前价为锚的确定性波动，同一时间的 K 线形态不随请求变化
+            drift = math.sin(t / (step * 37.0)) * 0.1 + math.sin(t / (step * 5.0)) * 0.02
+            open_price = base * (1 + drift)
+            close_price = open_price * (1 + rng.gauss(0, 0.01))
+            high = max(open_price, close_price) * (1 + abs(rng.gauss(0, 0.005)))
+            low = min(open_price, close_price) * (1 - abs(rng.gauss(0, 0.005)))
+            candles.append({
+                't': t,
+                'v': rng.randint(1000, 100000),
+                'o': _fmt(open_price),
+                'h': _fmt(high),
+                'l': _fmt(low),
+                'c': _fmt(close_price),
+            })
+        return candles
+
+
+class StandinAccount:
+    """单个 API Key 对应的模拟账户"""
+
+    def __init__(self):
+        self.positions = {}  # 合约 -> {'size', 'entry_price', 'realised_pnl'}
+        self.leverage = {}  # 合约 -> 杠杆
+        self.lock = threading.Lock()
+
+
+class TokenBucket:
+    """限频令牌桶，rate 为每秒请求数"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = rate
+        self.updated_at = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+class StandinExchange:
+    """替身服务的接口实现，与 HTTP 层无关，便于直接测试"""
+
+    def __init__(self, market: StandinMarket, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, private_rate: float = 0.0, public_rate: float = 0.0,
+                 clock_skew: float = 0.0, timestamp_window: float = 60.0):
+        """
+        Args:
+            market: 模拟行情
+            latency: 平均响应延迟（毫秒）
+            jitter: 延迟的标准差（毫秒）
+            error_rate: 随机返回 500 SERVER_ERROR 的比例
+            private_rate: 每个 API Key 私有接口每秒请求数上限，0 为不限
+            public_rate: 公共接口每秒请求数上限（全局），0 为不限
+            clock_skew: 服务器时钟相对本机的偏差（秒），用于测试时钟校准
+            timestamp_window: 签名时间戳允许的误差（秒），超出返回 REQUEST_EXPIRED
+        """
+        self.market = market
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.private_rate = private_rate
+        self.public_rate = public_rate
+        self.clock_skew = clock_skew
+        self.timestamp_window = timestamp_window
+        self.accounts = defaultdict(StandinAccount)
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._order_id = 0
+        self.stats = defaultdict(int)  # (路由, 状态码) -> 请求数
+        self._routes = [
+            ('GET', re.compile(r'/spot/time$'), self.server_time, False),
+            ('GET', re.compile(r'/futures/usdt/contracts$'), self.list_contracts, False),
+            ('GET', re.compile(r'/futures/usdt/contracts/(?P<contract>[^/]+)$'), self.get_contract, False),
+            ('GET', re.compile(r'/futures/usdt/tickers$'), self.list_tickers, False),
+            ('GET', re.compile(r'/futures/usdt/candlesticks$'), self.list_candlesticks, False),
+            ('GET', re.compile(r'/futures/usdt/positions$'), self.list_positions, True),
+            ('POST', re.compile(r'/futures/usdt/positions/(?P<contract>[^/]+)/leverage$'), self.update_leverage, True),
+            ('POST', re.compile(r'/futures/usdt/orders$'), self.create_order, True),
+            ('GET', re.compile(r'/standin/stats$'), self.get_stats, False),
+        ]
+
+    def now(self) -> float:
+        """服务器时间"""
+        return time.time() + self.clock_skew
+
+    def _next_order_id(self) -> int:
+        with self._lock:
+            self._order_id += 1
+            return self._order_id
+
+    def _check_rate(self, key: str, rate: float):
+        if not rate:
+            return
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(rate)
+            allowed = bucket.take()
+        if not allowed:
+            raise StandinError(429, 'TOO_MANY_REQUESTS', 'Request Rate limit Exceeded')
+
+    def _authenticate(self, headers) -> str:
+        api_key = headers.get('KEY')
+        if not api_key or not headers.get('SIGN'):
+            raise StandinError(401, 'INVALID_KEY', 'Missing API key or signature')
+        try:
+            timestamp = float(headers.get('Timestamp'))
+        except (TypeError, ValueError):
+            raise StandinError(401, 'MISSING_REQUIRED_HEADER', 'Missing Timestamp header')
+        if abs(self.now() - timestamp) > self.timestamp_window:
+            raise StandinError(401, 'REQUEST_EXPIRED', 'Request timestamp expired')
+        return api_key
+
+    def handle(self, method: str, path: str, query: dict, headers, body):
+        """处理一次请求
+
+        Returns:
+            (状态码, 响应对象)
+        """
+        route_name = 'unknown'
+        try:
+            if not path.startswith(API_PREFIX):
+                raise StandinError(404, 'NOT_FOUND', path)
+            path = path[len(API_PREFIX):]
+            for route_method, pattern, handler, private in self._routes:
+                match = pattern.match(path)
+                if match is None or route_method != method:
+                    continue
+                route_name = handler.__name__
+                if handler == self.get_stats:
+                    return 200, handler()
+                if self.error_rate and random.random() < self.error_rate:
+                    raise StandinError(500, 'SERVER_ERROR', 'Injected server error')
+                if private:
+                    api_key = self._authenticate(headers)
+                    self._check_rate(api_key, self.private_rate)
+                    return 200, handler(self.accounts[api_key], query=query, body=body, **match.groupdict())
+                self._check_rate('public', self.public_rate)
+                return 200, handler(query=query, **match.groupdict())
+            raise StandinError(404, 'NOT_FOUND', path)
+        except StandinError as e:
+            self.stats[(route_name, e.status)] += 1
+            return e.status, {'label': e.label, 'message': e.message}
+        finally:
+            self.stats[(route_name, 'total')] += 1
+
+    # 公共接口
+
+    def server_time(self, query):
+        return {'server_time': int(self.now() * 1000)}
+
+    def list_contracts(self, query):
+        return [self.market.contract(name) for name in self.market.contracts]
+
+    def get_contract(self, query, contract):
+        return self.market.contract(contract)
+
+    def list_tickers(self, query):
+        return self.market.tickers(query.get('contract'))
+
+    def list_candlesticks(self, query):
+        return self.market.candlesticks(
+            query.get('contract'),
+            query.get('interval', '5m'),
+            query.get('from'),
+            query.get('to'),
+            query.get('limit')
+        )
+
+    def get_stats(self):
+        return [{'route': route, 'status': status, 'count': count}
+                for (route, status), count in sorted(self.stats.items(), key=str)]
+
+    # 私有接口
+
+    def _position_view(self, account: StandinAccount, contract: str) -> dict:
+        """持仓的 Gate.io 格式（调用方持有账户锁）"""
+        info = self.market.contracts[contract]
+        position = account.positions.get(contract, {'size': 0, 'entry_price': 0.0, 'realised_pnl': 0.0})
+        leverage = account.leverage.get(contract, 10)
+        mark = self.market.price(contract)
+        multiplier = float(info['quanto_multiplier'])
+        value = abs(position['size']) * multiplier * mark
+        return {
+            'user': 1,
+            'contract': contract,
+            'size': position['size'],
+            'leverage': str(leverage),
+            'leverage_max': info['leverage_max'],
+            'risk_limit': '1000000',
+            'maintenance_rate': info['maintenance_rate'],
+            'value': _fmt(value),
+            'margin': _fmt(value / leverage),
+            'entry_price': _fmt(position['entry_price']),
+            'mark_price': _fmt(mark),
+            'liq_price': '0',
+            'unrealised_pnl': _fmt(position['size'] * multiplier * (mark - position['entry_price'])),
+            'realised_pnl': _fmt(position['realised_pnl']),
+            'mode': 'single',
+        }
+
+    def list_positions(self, account, query, body):
+        with account.lock:
+            contracts = [contract for contract, position in account.positions.items()
+                         if position['size'] != 0 or query.get('holding') != 'true']
+            return [self._position_view(account, contract) for contract in contracts]
+
+    def update_leverage(self, account, query, body, contract):
+        info = self.market.contracts.get(contract)
+        if info is None:
+            raise StandinError(400, 'CONTRACT_NOT_FOUND', f"contract {contract} not found")
+        try:
+            leverage = int(float(query.get('leverage')))
+        except (TypeError, ValueError):
+            raise StandinError(400, 'INVALID_PARAM_VALUE', 'invalid leverage')
+        if leverage < 0 or leverage > int(info['leverage_max']):
+            raise StandinError(400, 'INVALID_PARAM_VALUE', f"leverage must be within 0 and {info['leverage_max']}")
+        with account.lock:
+            account.leverage[contract] = leverage
+            return self._position_view(account, contract)
+
+    def _fill_order(self, account: StandinAccount, order: dict) -> dict:
+        """按最新价成交一个市价 IOC 订单"""
+        contract = order.get('contract')
+        info = self.market.contracts.get(contract)
+        if info is None:
+            raise StandinError(400, 'CONTRACT_NOT_FOUND', f"contract {contract} not found")
+        try:
+            size = int(order.get('size'))
+        except (TypeError, ValueError):
+            raise StandinError(400, 'INVALID_PARAM_VALUE', 'invalid size')
+        if size == 0 or abs(size) < info['order_size_min'] or abs(size) > info['order_size_max']:
+            raise StandinError(400, 'INVALID_PARAM_VALUE', f"invalid order size {size}")
+
+        with account.lock:
+            position = account.positions.setdefault(contract, {'size': 0, 'entry_price': 0.0, 'realised_pnl': 0.0})
+            opening = position['size'] == 0 or (position['size'] > 0) == (size > 0)
+            if info['in_delisting'] and opening:
+                raise StandinError(400, 'CONTRACT_IN_DELISTING', f"contract {contract} is in delisting")
+            fill_price = self.market.price(contract)
+            multiplier = float(info['quanto_multiplier'])
+            old_size = position['size']
+            new_size = old_size + size
+            if opening:
+                position['entry_price'] = (
+                    (abs(old_size) * position['entry_price'] + abs(size) * fill_price) / abs(new_size)
+                )
+            else:
+                closed = min(abs(size), abs(old_size))
+                direction = 1 if old_size > 0 else -1
+                position['realised_pnl'] += closed * multiplier * (fill_price - position['entry_price']) * direction
+                if new_size != 0 and (new_size > 0) != (old_size > 0):
+                    position['entry_price'] = fill_price  # 反手，剩余部分按成交价开仓
+            position['size'] = new_size
+            if new_size == 0:
+                position['entry_price'] = 0.0
+
+        now = self.now()
+        return {
+            'id': self._next_order_id(),
+            'user': 1,
+            'create_time': now,
+            'finish_time': now,
+            'finish_as': 'filled',
+            'status': 'finished',
+            'contract': contract,
+            'size': size,
+            'iceberg': 0,
+            'price': order.get('price', '0'),
+            'tif': order.get('tif', 'ioc'),
+            'left': 0,
+            'fill_price': _fmt(fill_price),
+            'text': order.get('text', 'api'),
+            'tkfr': '0.0005',
+            'mkfr': '0.0002',
+        }
+
+    def create_order(self, account, query, body):
+        if not isinstance(body, dict):
+            raise StandinError(400, 'INVALID_REQUEST_BODY', 'order body required')
+        return self._fill_order(account, body)
+
+
+class StandinRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # 支持 keep-alive，与客户端连接池配合
+
+    def _dispatch(self, method: str):
+        exchange = self.server.exchange
+        url = urlsplit(self.path)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        body = None
+        length = int(self.headers.get('Content-Length') or 0)
+        if length:
+            try:
+                body = json.loads(self.rfile.read(length))
+            except ValueError:
+                body = None
+
+        if exchange.latency or exchange.jitter:
+            time.sleep(max(0.0, random.gauss(exchange.latency, exchange.jitter)) / 1000)
+        status, payload = exchange.handle(method, url.path, query, self.headers, body)
+
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StandinServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address, exchange: StandinExchange):
+        super().__init__(address, StandinRequestHandler)
+        self.exchange = exchange
+
+    @property
+    def host(self) -> str:
+        """供 DataManager(host=...) 和 GATE_API_HOST 使用的 API 地址"""
+        address, port = self.server_address[:2]
+        return f"http://{address}:{port}{API_PREFIX}"
+
+
+def start_standin(port: int = 0, contracts: int = 200, delisting_rate: float = 0.0, **options) -> StandinServer:
+    """在后台线程启动替身服务
+
+    Args:
+        port: 监听端口，0 为随机端口
+        contracts: 模拟合约数量
+        delisting_rate: 下架中合约的比例
+        options: 传给 StandinExchange 的延迟、错误率、限频等参数
+
+    Returns:
+        StandinServer，通过 server.host 获取 API 地址，server.shutdown() 停止
+    """
+    exchange = StandinExchange(StandinMarket(contracts, delisting_rate), **options)
+    server = StandinServer(('127.0.0.1', port), exchange)
+    threading.Thread(target=server.serve_forever, name='gate-standin', daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地 Gate.io 期货接口替身服务')
+    parser.add_argument('--port', type=int, default=18080, help='监听端口')
+    parser.add_argument('--contracts', type=int, default=200, help='模拟合约数量')
+    parser.add_argument('--delisting-rate', type=float, default=0.0, help='下架中合约的比例')
+    parser.add_argument('--latency', type=float, default=0.0, help='平均响应延迟（毫秒）')
+    parser.add_argument('--jitter', type=float, default=0.0, help='延迟标准差（毫秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='随机返回 500 的比例')
+    parser.add_argument('--private-rate', type=float, default=0.0, help='每个 API Key 私有接口每秒请求数上限，0 为不限')
+    parser.add_argument('--public-rate', type=float, default=0.0, help='公共接口每秒请求数上限，0 为不限')
+    parser.add_argument('--clock-skew', type=float, default=0.0, help='服务器时钟偏差（秒）')
+    args = parser.parse_args()
+
+    server = StandinServer(('127.0.0.1', args.port), StandinExchange(
+        StandinMarket(args.contracts, args.delisting_rate),
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        private_rate=args.private_rate,
+        public_rate=args.public_rate,
+        clock_skew=args.clock_skew
+    ))
+    print(f"替身服务已启动: {server.host}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
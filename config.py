@@ -6,6 +6,24 @@ from dotenv import load_dotenv
 # 加载环境变量
 load_dotenv()
 
+
+def database_uri(db_config: dict) -> str:
+    """根据数据库配置生成 SQLAlchemy 连接地址"""
+    return (
+        f"mysql+pymysql://{db_config['USER']}:{quote_plus(db_config['PASSWORD'])}"
+        f"@{db_config['HOST']}:{db_config['PORT']}/{db_config['NAME']}"
+    )
+
+
+def database_binds(databases: dict, default_database: str, engine_options: dict) -> dict:
+    """为默认服务器以外的每个数据库服务器生成 SQLALCHEMY_BINDS 配置（键与 databases 相同）"""
+    return {
+        server_id: dict(engine_options, url=database_uri(db_config))
+        for server_id, db_config in databases.items()
+        if server_id != default_database
+    }
+
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'your-secret-key'
     
@@ -28,12 +46,10 @@ class Config:
     }
     
     # 默认数据库配置
-    DB_CONFIG = DATABASES['server2']
+    DEFAULT_DATABASE = 'server2'
+    DB_CONFIG = DATABASES[DEFAULT_DATABASE]
     ENCODED_PASSWORD = quote_plus(DB_CONFIG['PASSWORD'])
-    SQLALCHEMY_DATABASE_URI = (
-        f"mysql+pymysql://{DB_CONFIG['USER']}:{ENCODED_PASSWORD}"
-        f"@{DB_CONFIG['HOST']}:{DB_CONFIG['PORT']}/{DB_CONFIG['NAME']}"
-    )
+    SQLALCHEMY_DATABASE_URI = database_uri(DB_CONFIG)
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ENGINE_OPTIONS = {
@@ -41,11 +57,19 @@ class Config:
         'pool_recycle': 3600,
         'pool_timeout': 30,
         'max_overflow': 2,
+        'pool_pre_ping': True,
         'connect_args': {
-            'connect_timeout': 10
+            'connect_timeout': 10,
+            'read_timeout': 30,
+            'write_timeout': 30,
+            'charset': 'utf8mb4'
         }
     }
     
+    # 其他数据库服务器的引擎，键与 DATABASES 相同，连接池参数与默认引擎一致；
+    # ORM 和原生 SQL（DatabaseConnection）共用这些引擎的连接池
+    SQLALCHEMY_BINDS = database_binds(DATABASES, DEFAULT_DATABASE, SQLALCHEMY_ENGINE_OPTIONS)
+    
     # JWT配置
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY') or 'jwt-secret-key'
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(days=1)
@@ -60,4 +84,42 @@ class Config:
     
     # 价格范围配置
     PRICE_RANGE_DAYS = 20  # 价格范围的天数
-    PRICE_UPDATE_INTERVAL = 60  # 实时价格更新间隔（秒）
\ No newline at end of file
+    PRICE_RANGE_WINDOWS = [int(days) for days in os.environ.get('PRICE_RANGE_WINDOWS', '10,20,55').split(',')]  # 需要计算的价格范围窗口（天），K线按最长窗口获取
+    PRICE_RANGE_CHECKPOINT_DAYS = int(os.environ.get('PRICE_RANGE_CHECKPOINT_DAYS', 7))  # 断点续跑进度的保留天数
+    PRICE_RANGE_HISTORY_DAYS = int(os.environ.get('PRICE_RANGE_HISTORY_DAYS', 365))  # 价格范围历史快照的保留天数
+    # 日内价格范围流水线：K线周期 -> 窗口（K线根数）、刷新间隔（分钟）和新鲜度SLA（K线收盘后多少分钟内完成计算）
+    INTRADAY_RANGE_PIPELINES = {
+        '1h': {'windows': [24, 72, 168], 'refresh_minutes': 10, 'sla_minutes': 15},
+        '4h': {'windows': [6, 18, 42], 'refresh_minutes': 30, 'sla_minutes': 45},
+    }
+    PRICE_UPDATE_INTERVAL = 60  # 实时价格更新间隔（秒）
+    TICK_CHANGE_EPSILON = float(os.environ.get('TICK_CHANGE_EPSILON', 1e-9))  # 行情变化的相对误差阈值
+    TICK_HEARTBEAT_SECONDS = int(os.environ.get('TICK_HEARTBEAT_SECONDS', 90))  # 未变化行刷新update_time的间隔（需小于持仓同步的3分钟新鲜度）
+    UPDATER_CONFIG_CHECK_SECONDS = int(os.environ.get('UPDATER_CONFIG_CHECK_SECONDS', 300))  # 常驻更新器检查账户配置变化的间隔
+    TICKER_STREAM_URL = os.environ.get('TICKER_STREAM_URL', 'wss://fx-ws.gateio.ws/v4/ws/usdt')  # 推送行情地址，可指向本地替身服务器
+    TICKER_STREAM_REPLAY_FILE = os.environ.get('TICKER_STREAM_REPLAY_FILE')  # 录制的推送行情文件，设置后回放该文件
+    TICKER_FLUSH_INTERVAL = int(os.environ.get('TICKER_FLUSH_INTERVAL', 5))  # 推送行情写入数据库的间隔（秒）
+    TICKER_STREAM_MAX_AGE = float(os.environ.get('TICKER_STREAM_MAX_AGE', 30))  # 推送行情超过该秒数未更新视为过期，不写入也不刷新update_time
+    TICKER_STREAM_FALLBACK_INTERVAL = float(os.environ.get('TICKER_STREAM_FALLBACK_INTERVAL', 60))  # 缺少新鲜推送行情的品种改用REST行情的间隔（秒）
+    PRICE_FETCH_WORKERS = int(os.environ.get('PRICE_FETCH_WORKERS', 8))  # K线并发获取线程数
+    
+    # 行情录制与回放配置
+    MARKET_REPLAY_MODE = os.environ.get('MARKET_REPLAY_MODE')  # record：录制接口响应；replay：回放录制文件，不访问交易所
+    MARKET_REPLAY_FILE = os.environ.get('MARKET_REPLAY_FILE', 'market_replay.jsonl.gz')  # 录制文件（gzip 压缩的 JSON Lines）
+    MARKET_REPLAY_SPEED = float(os.environ.get('MARKET_REPLAY_SPEED', 0))  # 回放倍速，0 为步进模式（每次获取行情前进一步）
+
+    # Gate.io 接口限频配置（次/秒）
+    GATE_PUBLIC_RATE = float(os.environ.get('GATE_PUBLIC_RATE', 20))  # 公共接口（按IP）
+    GATE_PRIVATE_RATE = float(os.environ.get('GATE_PRIVATE_RATE', 20))  # 私有接口（按API Key）
+    API_CLIENT_IDLE_SECONDS = int(os.environ.get('API_CLIENT_IDLE_SECONDS', 600))  # API客户端空闲回收时间（秒）
+    API_CLIENT_POOL_SIZE = int(os.environ.get('API_CLIENT_POOL_SIZE', 10))  # 每个API客户端的连接池大小
+    CONTRACT_CACHE_TTL = int(os.environ.get('CONTRACT_CACHE_TTL', 300))  # 合约元数据缓存有效期（秒）
+    TICKER_SNAPSHOT_MAX_AGE = float(os.environ.get('TICKER_SNAPSHOT_MAX_AGE', 5))  # 共享行情快照默认可接受的年龄（秒）
+    ORDER_PRICE_MAX_AGE = float(os.environ.get('ORDER_PRICE_MAX_AGE', 3))  # 下单计算张数时行情价格的最大年龄（秒）
+    POSITION_CACHE_TTL = float(os.environ.get('POSITION_CACHE_TTL', 3))  # 账户持仓缓存有效期（秒）
+    POSITION_CACHE_SIZE = int(os.environ.get('POSITION_CACHE_SIZE', 256))  # 持仓缓存最多保存的账户数
+    LEVERAGE_CACHE_TTL = float(os.environ.get('LEVERAGE_CACHE_TTL', 3600))  # 杠杆状态缓存有效期（秒）
+    ORDER_SUBMIT_WORKERS = int(os.environ.get('ORDER_SUBMIT_WORKERS', 5))  # 拆分子订单的并发提交线程数
+    CLOCK_SYNC_INTERVAL = float(os.environ.get('CLOCK_SYNC_INTERVAL', 300))  # 交易所时钟偏差校准间隔（秒）
+    CLOCK_SYNC_SAMPLES = int(os.environ.get('CLOCK_SYNC_SAMPLES', 3))  # 每次校准的采样次数，取往返时间最短的一次
+    GATE_API_HOST = os.environ.get('GATE_API_HOST', 'https://api.gateio.ws/api/v4')  # 交易所 API 地址，压测时可指向本地替身服务
\ No newline at end of file
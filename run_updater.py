@@ -20,6 +20,22 @@ if __name__ == "__main__":
                 # 单次运行实时行情更新
                 updater = PriceUpdater()
                 updater.update_ticks()
+            elif sys.argv[1] == '--rebuild':
+                # 由本地K线批量重算价格范围
+                updater = PriceUpdater()
+                updater.rebuild_price_ranges()
+            elif sys.argv[1] == '--compact-history':
+                # 清理过期的历史快照分区
+                updater = PriceUpdater()
+                updater.compact_history()
+            elif sys.argv[1] == '--interval':
+                # 单次运行日内周期的价格范围更新，如 --interval 1h
+                updater = PriceUpdater()
+                updater.run_interval(sys.argv[2])
+            elif sys.argv[1] == '--stream':
+                # 推送行情模式的调度器
+                from app.price_updater import run_scheduler
+                run_scheduler(stream=True)
             elif sys.argv[1] == '--update':
                 # 单次运行实时行情更新
                 updater = PriceUpdater()
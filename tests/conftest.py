@@ -0,0 +1,7 @@
+import os
+import sys
+
+# 添加项目根目录到 Python 路径
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_dir not in sys.path:
+    sys.path.insert(0, project_dir)
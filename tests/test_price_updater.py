@@ -0,0 +1,222 @@
+from datetime import date, datetime, time, timedelta
+from types import SimpleNamespace
+import pytest
+from flask import Flask
+from sqlalchemy.pool import StaticPool
+from app import db
+from app.models import PriceRange20d
+from app.price_updater import PriceUpdater
+from app.rolling_extrema import RollingExtrema
+
+TODAY = datetime.combine(date.today(), time())
+
+
+def day_timestamp(days_ago: int) -> int:
+    return int((TODAY - timedelta(days=days_ago)).timestamp())
+
+
+def make_candles(days: int, first_days_ago: int = 1, close: float = 100.0):
+    """最近 days 根日线，最后一根为 first_days_ago 天前"""
+    return [
+        {'timestamp': day_timestamp(days_ago), 'open': close, 'high': close, 'low': close,
+         'close': close + days_ago, 'volume': 1.0}
+        for days_ago in range(first_days_ago + days - 1, first_days_ago - 1, -1)
+    ]
+
+
+class FakeCandleStore:
+    """内存K线存储，接口与 CandleStore 一致"""
+
+    def __init__(self):
+        self.candles = {}
+
+    def get_last_timestamps(self, interval):
+        return {symbol: max(candles) for symbol, candles in self.candles.items() if candles}
+
+    def get_window_coverage(self, interval, start_timestamp):
+        coverage = {}
+        for symbol, candles in self.candles.items():
+            timestamps = [timestamp for timestamp in candles if timestamp >= start_timestamp]
+            if timestamps:
+                coverage[symbol] = (max(timestamps), len(timestamps))
+        return coverage
+
+    def append(self, symbol, interval, candles):
+        stored = self.candles.setdefault(symbol, {})
+        for candle in candles:
+            stored[candle['timestamp']] = candle['close']
+        return len(candles)
+
+    def load_candles(self, symbol, interval, end_timestamp, limit, start_timestamp=None):
+        rows = sorted(
+            (timestamp, close) for timestamp, close in self.candles.get(symbol, {}).items()
+            if timestamp <= end_timestamp and (start_timestamp is None or timestamp >= start_timestamp)
+        )
+        return [SimpleNamespace(timestamp=timestamp, close=close) for timestamp, close in rows[-limit:]]
+
+
+class FakeStateStore:
+    def __init__(self, states):
+        self.states = states
+
+    def load_all(self, interval, max_window):
+        return dict(self.states)
+
+    def save(self, symbol, interval, extrema):
+        self.states[symbol] = extrema
+
+
+class StubDataManager:
+    """模拟交易所：failing 中的品种请求失败，没有K线的品种返回空列表"""
+
+    def __init__(self, exchange, failing=()):
+        self.exchange = exchange
+        self.failing = set(failing)
+        self.requests = {}
+
+    def get_contract_map(self):
+        return {symbol: SimpleNamespace(name=f"{symbol}_USDT") for symbol in self.exchange}
+
+    def get_futures_candlesticks(self, symbol, from_time, to_time, interval='1d'):
+        self.requests[symbol] = from_time
+        if symbol in self.failing:
+            return None
+        return [candle for candle in self.exchange[symbol] if from_time <= candle['timestamp'] <= to_time]
+
+
+class StubPriceUpdater(PriceUpdater):
+    """用内存实现替换 MySQL 专用的写入（ON DUPLICATE KEY UPDATE）和外部连接"""
+
+    def __init__(self, app, data_manager, candle_store, state_store):
+        super().__init__(app)
+        self.data_manager = data_manager
+        self.candle_store = candle_store
+        self.range_state_store = state_store
+        self.checkpoints = {}
+        self.window_ranges = {}
+        self.snapshots = []
+
+    def ensure_connections(self):
+        pass
+
+    def purge_checkpoints(self, run_date):
+        pass
+
+    def load_checkpoint(self, run_date, interval='1d'):
+        return {symbol: status for symbol, (status, _) in self.checkpoints.items()}
+
+    def load_checkpoint_volumes(self, run_date, interval='1d'):
+        return {symbol: volume for symbol, (_, volume) in self.checkpoints.items() if volume is not None}
+
+    def mark_checkpoint(self, run_date, symbol, status, interval='1d', volume_24h=None):
+        self.checkpoints[symbol] = (status, volume_24h)
+
+    def save_window_ranges(self, symbol, interval, window_ranges, update_date):
+        self.window_ranges[symbol] = window_ranges
+
+    def snapshot_history(self, update_date, volumes=None):
+        self.snapshots.append((update_date, volumes))
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.config.update(
+        SQLALCHEMY_DATABASE_URI='sqlite://',
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        SQLALCHEMY_ENGINE_OPTIONS={'poolclass': StaticPool, 'connect_args': {'check_same_thread': False}},
+        DATABASES={},
+    )
+    db.init_app(app)
+    with app.app_context():
+        PriceRange20d.__table__.create(db.engine)
+    return app
+
+
+@pytest.fixture
+def updater(app):
+    stale_date = date.today() - timedelta(days=2)
+    candle_store = FakeCandleStore()
+    states = {}
+    exchange = {}
+    with app.app_context():
+        for symbol in ('FAIL', 'GONE', 'OK'):
+            stored = make_candles(55, first_days_ago=2)
+            candle_store.append(symbol, '1d', stored)
+            states[symbol] = RollingExtrema(55)
+            for candle in stored:
+                states[symbol].push(candle['timestamp'], candle['close'])
+            exchange[symbol] = stored + make_candles(1, close=50.0)
+            db.session.add(PriceRange20d(
+                symbol=symbol, high_price_20d=1, low_price_20d=1, last_price=1, amplitude=0,
+                position_ratio=0, volume_24h=123, update_date=stale_date
+            ))
+        exchange['GONE'] = []
+        # 只存有 20 根K线（例如调大了窗口配置），需要回补完整窗口
+        candle_store.append('SHORT', '1d', make_candles(20, first_days_ago=2))
+        exchange['SHORT'] = make_candles(56)
+        db.session.commit()
+
+    data_manager = StubDataManager(exchange, failing={'FAIL'})
+    updater = StubPriceUpdater(app, data_manager, candle_store, FakeStateStore(states))
+    assert updater.state_days == 55
+    return updater
+
+
+def records(app):
+    with app.app_context():
+        return {record.symbol: record for record in PriceRange20d.query.all()}
+
+
+def test_failed_fetch_is_not_saved_or_checkpointed(app, updater):
+    updater.run()
+
+    record = records(app)['FAIL']
+    assert 'FAIL' not in updater.checkpoints
+    assert record.update_date == date.today() - timedelta(days=2)
+    assert float(record.last_price) == 1
+
+
+def test_empty_response_is_checkpointed_as_no_data(app, updater):
+    updater.run()
+
+    assert updater.checkpoints['GONE'] == ('no_data', None)
+    assert records(app)['GONE'].update_date == date.today() - timedelta(days=2)
+
+
+def test_updated_symbol_keeps_pre_reset_volume(app, updater):
+    updater.run()
+
+    record = records(app)['OK']
+    assert updater.checkpoints['OK'] == ('done', 123.0)
+    assert record.update_date == date.today() - timedelta(days=1)
+    assert float(record.last_price) == 51.0
+    assert float(record.volume_24h) == 0
+    assert updater.snapshots == [(date.today() - timedelta(days=1), {'OK': 123.0})]
+
+
+def test_incremental_fetch_starts_at_last_stored_bar(updater):
+    updater.run()
+    assert updater.data_manager.requests['OK'] == day_timestamp(2)
+
+
+def test_short_history_is_backfilled(app, updater):
+    updater.run()
+
+    window_start, _ = updater._get_candle_window()
+    assert updater.data_manager.requests['SHORT'] == window_start
+    assert updater.checkpoints['SHORT'] == ('done', None)
+    assert set(updater.window_ranges['SHORT']) == {10, 20, 55}
+    assert 'SHORT' in records(app)
+
+
+def test_resumed_run_skips_checkpointed_symbols(updater):
+    updater.run()
+    requests = dict(updater.data_manager.requests)
+    updater.data_manager.requests.clear()
+
+    updater.run()
+    # 只重试获取失败的品种，快照仍包含中断前处理的品种的成交量
+    assert set(updater.data_manager.requests) == {'FAIL'}
+    assert set(requests) == {'FAIL', 'GONE', 'OK', 'SHORT'}
+    assert updater.snapshots[-1][1] == {'OK': 123.0}
@@ -0,0 +1,67 @@
+import pytest
+from app import rate_limiter
+from app.rate_limiter import ExchangeRateLimiter, RateLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        # 真实时钟总会前进，浮点误差导致的极短等待至少推进 1 微秒
+        self.now += max(seconds, 1e-6)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, 'time', clock)
+    return clock
+
+
+def test_burst_then_waits_for_refill(clock):
+    limiter = RateLimiter(10, 5)
+    assert [limiter.acquire() for _ in range(5)] == [0.0] * 5
+    assert limiter.acquire() == pytest.approx(0.1)
+    assert limiter.acquire(2) == pytest.approx(0.2)
+
+
+def test_idle_refill_is_capped_at_capacity(clock):
+    limiter = RateLimiter(10, 5)
+    for _ in range(5):
+        limiter.acquire()
+    clock.now += 60
+    assert sum(limiter.acquire() for _ in range(5)) == 0.0
+    assert limiter.acquire() > 0
+
+
+def test_drain_pauses_later_requests(clock):
+    limiter = RateLimiter(10)
+    limiter.drain(2)
+    assert limiter.acquire() == pytest.approx(2.1)
+
+
+def test_invalid_rate():
+    with pytest.raises(ValueError):
+        RateLimiter(0)
+
+
+def test_private_buckets_are_per_api_key(clock):
+    limiter = ExchangeRateLimiter(public_rate=100, private_rate=2)
+    assert limiter.acquire('list_positions', 'key-a') == 0.0
+    assert limiter.acquire('list_positions', 'key-a') == 0.0
+    assert limiter.acquire('list_positions', 'key-b') == 0.0
+    assert limiter.acquire('list_positions', 'key-a') == pytest.approx(0.5)
+
+
+def test_order_weight_and_backoff(clock):
+    limiter = ExchangeRateLimiter(public_rate=100, private_rate=2)
+    # 下单接口按 0.2 的权重计算，满桶可以连续下 10 单
+    assert sum(limiter.acquire('create_futures_order', 'key') for _ in range(10)) == 0.0
+    assert limiter.acquire('create_futures_order', 'key') > 0
+
+    limiter.backoff('list_futures_tickers', seconds=3)
+    assert limiter.acquire('list_futures_tickers') == pytest.approx(3.01)
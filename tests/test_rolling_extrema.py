@@ -0,0 +1,65 @@
+import random
+import pytest
+from app.rolling_extrema import RollingExtrema
+
+
+def brute_force(closes, window):
+    tail = closes[-window:]
+    return max(tail), min(tail)
+
+
+def test_matches_brute_force_for_all_windows():
+    rng = random.Random(7)
+    extrema = RollingExtrema(55)
+    closes = []
+    for timestamp in range(400):
+        close = round(rng.uniform(90, 110), 2)
+        extrema.push(timestamp, close)
+        closes.append(close)
+        if rng.random() < 0.2:
+            # 修正最后一根K线
+            close = round(rng.uniform(90, 110), 2)
+            extrema.push(timestamp, close)
+            closes[-1] = close
+        if rng.random() < 0.1:
+            # 早于最后一根的K线被忽略
+            extrema.push(timestamp - 1, 1000.0)
+
+        assert extrema.count == min(len(closes), 55)
+        assert extrema.last_close == closes[-1]
+        for window in (10, 20, 55):
+            high, low = brute_force(closes, window)
+            assert extrema.high(window)[1] == high
+            assert extrema.low(window)[1] == low
+
+
+def test_unchanged_last_bar_skips_rebuild(monkeypatch):
+    extrema = RollingExtrema.from_closes([3.0, 1.0, 2.0])
+    monkeypatch.setattr(extrema, '_rebuild', lambda: pytest.fail('收盘价未变化时不应重建'))
+    extrema.push(2, 2.0)
+    assert extrema.high(3) == (0, 3.0)
+
+
+def test_corrected_last_bar_updates_extrema():
+    extrema = RollingExtrema.from_closes([3.0, 1.0, 2.0])
+    extrema.push(2, 5.0)
+    assert extrema.high(3) == (2, 5.0)
+    assert extrema.low(3) == (1, 1.0)
+    assert extrema.count == 3
+
+
+def test_window_larger_than_max_window_raises():
+    extrema = RollingExtrema.from_closes([1.0, 2.0], max_window=2)
+    with pytest.raises(ValueError):
+        extrema.high(3)
+
+
+@pytest.mark.parametrize('max_window', [None, 5, 30])
+def test_from_dict_round_trip(max_window):
+    closes = [float(value % 17) for value in range(40)]
+    extrema = RollingExtrema.from_closes(closes, 20)
+    restored = RollingExtrema.from_dict(extrema.to_dict(), max_window)
+    window = min(restored.max_window, 20)
+    assert restored.count == window
+    assert restored.high(window)[1] == max(closes[-window:])
+    assert restored.low(window)[1] == min(closes[-window:])
@@ -0,0 +1,67 @@
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from app.bulk_writer import TickChangeTracker
+
+NOW = datetime(2026, 1, 2, 12, 0, 0)
+
+
+def make_row(symbol='BTC', last_price=100.0, update_date=date(2026, 1, 2), update_time=NOW, **values):
+    row = {
+        'symbol': symbol,
+        'last_price': last_price,
+        'amplitude': 0.1,
+        'position_ratio': 0.5,
+        'volume_24h': 1000.0,
+        'update_date': update_date,
+        'update_time': update_time,
+    }
+    row.update(values)
+    return row
+
+
+def test_untracked_symbol_is_written():
+    tracker = TickChangeTracker(1e-9, 90)
+    assert tracker.select([make_row()], NOW) == [make_row()]
+
+
+def test_unchanged_row_is_skipped_until_heartbeat():
+    tracker = TickChangeTracker(1e-9, 90)
+    tracker.mark_persisted([make_row()])
+
+    assert tracker.select([make_row()], NOW + timedelta(seconds=89)) == []
+    assert len(tracker.select([make_row()], NOW + timedelta(seconds=90))) == 1
+
+
+def test_changes_beyond_epsilon_are_written():
+    tracker = TickChangeTracker(1e-6, 90)
+    tracker.mark_persisted([make_row()])
+
+    assert tracker.select([make_row(last_price=100.00001)], NOW) == []
+    assert len(tracker.select([make_row(last_price=100.001)], NOW)) == 1
+    assert len(tracker.select([make_row(volume_24h=2000.0)], NOW)) == 1
+
+
+def test_date_change_is_written():
+    tracker = TickChangeTracker(1e-9, 90)
+    tracker.mark_persisted([make_row()])
+    assert len(tracker.select([make_row(update_date=date(2026, 1, 3))], NOW)) == 1
+
+
+def test_seed_from_record():
+    tracker = TickChangeTracker(1e-9, 90)
+    record = SimpleNamespace(
+        symbol='BTC', last_price=100, amplitude=0.1, position_ratio=0.5, volume_24h=None,
+        update_date=date(2026, 1, 2), update_time=NOW
+    )
+    tracker.seed(record)
+    assert tracker.select([make_row(volume_24h=0.0)], NOW) == []
+
+    # 已跟踪的品种不会被数据库记录覆盖
+    tracker.seed(SimpleNamespace(**dict(vars(record), last_price=1)))
+    assert tracker.select([make_row(volume_24h=0.0)], NOW) == []
+
+
+def test_missing_update_time_is_written():
+    tracker = TickChangeTracker(1e-9, 90)
+    tracker.mark_persisted([make_row(update_time=None)])
+    assert len(tracker.select([make_row()], NOW)) == 1